@@ -2,11 +2,36 @@
 Code Demon - AI Coding & Server Admin Assistant
 """
 
+import importlib
+from typing import TYPE_CHECKING, Any
+
 __version__ = "0.1.0"
 __author__ = "Tomasz"
 
-from .core.agent import Agent
-from .config.settings import get_settings
+if TYPE_CHECKING:
+    from .core.agent import Agent
+    from .config.settings import get_settings
+
+# Public attributes resolved on first access (PEP 562) so that importing the
+# package does not pull in the agent stack
+_LAZY_ATTRS = {
+    "Agent": ".core.agent",
+    "get_settings": ".config.settings",
+}
 
 __all__ = ["Agent", "get_settings", "__version__"]
 
+
+def __getattr__(name: str) -> Any:
+    """Import lazily exported attributes on first access"""
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+    return sorted(set(globals()) | set(_LAZY_ATTRS))
@@ -5,13 +5,15 @@ Code Demon - AI Coding & Server Admin Assistant
 Main entry point for the CLI
 """
 
-import asyncio
 import sys
 import os
 import logging
+from functools import lru_cache
+from typing import TYPE_CHECKING, Callable, Dict
+
 import click
-from rich.console import Console
-from rich.prompt import Prompt
+
+from . import __version__
 
 # Suppress verbose logging from dependencies BEFORE imports
 os.environ.setdefault("COGNEE_LOG_LEVEL", "CRITICAL")
@@ -22,117 +24,257 @@ logging.getLogger("httpcore").setLevel(logging.CRITICAL)
 logging.getLogger("structlog").setLevel(logging.CRITICAL)
 logging.getLogger("lancedb").setLevel(logging.CRITICAL)
 
-from .config.settings import get_settings
-from .core.llm.ollama import OllamaProvider
-from .core.llm.textgen import TextGenProvider
-from .core.agent import Agent
-from .tools.registry import get_registry
-from .history.storage import get_history_storage
-from .achievements.tracker import get_achievement_tracker
-from .core.approval import get_approval_system
-from .core.memory import get_memory_system
-from .cli.ui import (
-    print_banner,
-    print_welcome,
-    print_goodbye,
-    print_help,
-    print_stats,
-    print_achievements,
-    print_error,
-    print_info,
-)
+# Everything beyond click is imported inside the functions below, so that
+# `--help` and argument errors don't pay for the tool/LLM/agent stack
+if TYPE_CHECKING:
+    from .core.agent import Agent
+    from .core.llm.base import LLMProvider
+    from .tools.registry import Tool
+    from rich.console import Console
 
-# Import and register all tools
-from .tools.files.read import ReadFileTool
-from .tools.files.write import WriteFileTool
-from .tools.files.edit import EditFileTool
-from .tools.files.search import SearchFilesTool, ListDirectoryTool
-from .tools.git.status import GitStatusTool
-from .tools.git.commit import GitCommitTool, GitAddTool
-from .tools.git.diff import GitDiffTool
-from .tools.git.branch import GitBranchTool, GitCheckoutTool
-from .tools.git.push import GitPushTool, GitPullTool
-from .tools.execution.command import ExecuteCommandTool, RunPythonTool, RunTestsTool
-from .tools.web.http import FetchURLTool, CallAPITool, WebSearchTool
 
-console = Console()
+class _LoopRunner:
+    """Minimal stand-in for asyncio.Runner (Python 3.11+) on Python 3.10"""
 
+    def __init__(self) -> None:
+        import asyncio
 
-def register_all_tools() -> None:
-    """Register all available tools"""
-    registry = get_registry()
+        self._loop = asyncio.new_event_loop()
 
-    # File tools
-    registry.register(ReadFileTool())
-    registry.register(WriteFileTool())
-    registry.register(EditFileTool())
-    registry.register(SearchFilesTool())
-    registry.register(ListDirectoryTool())
+    def __enter__(self) -> "_LoopRunner":
+        return self
 
-    # Git tools
-    registry.register(GitStatusTool())
-    registry.register(GitCommitTool())
-    registry.register(GitAddTool())
-    registry.register(GitDiffTool())
-    registry.register(GitBranchTool())
-    registry.register(GitCheckoutTool())
-    registry.register(GitPushTool())
-    registry.register(GitPullTool())
+    def __exit__(self, *exc_info) -> None:
+        self.close()
 
-    # Execution tools
-    registry.register(ExecuteCommandTool())
-    registry.register(RunPythonTool())
-    registry.register(RunTestsTool())
+    def run(self, coro):
+        """Run a coroutine to completion on the shared loop"""
+        return self._loop.run_until_complete(coro)
+
+    def close(self) -> None:
+        """Shut down async generators and close the loop"""
+        try:
+            self._loop.run_until_complete(self._loop.shutdown_asyncgens())
+        finally:
+            self._loop.close()
+
+
+def _quick_tcp_probe(url: str, timeout: float = 0.5) -> bool:
+    """Check that something accepts TCP connections at the URL's host and port"""
+    import socket
+    from urllib.parse import urlsplit
+
+    parts = urlsplit(url)
+    if not parts.hostname:
+        return False
 
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        with socket.create_connection((parts.hostname, port), timeout=timeout):
+            return True
+    except (OSError, ValueError):
+        return False
+
+
+def _create_runner():
+    """Create a runner that reuses one event loop across several coroutines"""
+    import asyncio
+
+    if hasattr(asyncio, "Runner"):
+        return asyncio.Runner()
+    return _LoopRunner()
+
+
+# Commands that end the chat loop
+_EXIT_COMMANDS = frozenset({"exit", "quit"})
+
+
+# (tool name, module, class) for every built-in tool; modules are imported
+# and tools constructed only when the registry first needs them
+_TOOL_SPECS: tuple[tuple[str, str, str], ...] = (
+    # File tools
+    ("read_file", ".tools.files.read", "ReadFileTool"),
+    ("write_file", ".tools.files.write", "WriteFileTool"),
+    ("edit_file", ".tools.files.edit", "EditFileTool"),
+    ("search_files", ".tools.files.search", "SearchFilesTool"),
+    ("list_directory", ".tools.files.search", "ListDirectoryTool"),
+    # Git tools
+    ("git_status", ".tools.git.status", "GitStatusTool"),
+    ("git_commit", ".tools.git.commit", "GitCommitTool"),
+    ("git_add", ".tools.git.commit", "GitAddTool"),
+    ("git_diff", ".tools.git.diff", "GitDiffTool"),
+    ("git_branch", ".tools.git.branch", "GitBranchTool"),
+    ("git_checkout", ".tools.git.branch", "GitCheckoutTool"),
+    ("git_push", ".tools.git.push", "GitPushTool"),
+    ("git_pull", ".tools.git.push", "GitPullTool"),
+    # Execution tools
+    ("execute_command", ".tools.execution.command", "ExecuteCommandTool"),
+    ("run_python", ".tools.execution.command", "RunPythonTool"),
+    ("run_tests", ".tools.execution.command", "RunTestsTool"),
     # Web tools
-    registry.register(FetchURLTool())
-    registry.register(CallAPITool())
-    registry.register(WebSearchTool())
+    ("fetch_url", ".tools.web.http", "FetchURLTool"),
+    ("call_api", ".tools.web.http", "CallAPITool"),
+    ("web_search", ".tools.web.http", "WebSearchTool"),
+)
+
 
+def _tool_factory(module_name: str, class_name: str) -> Callable[[], "Tool"]:
+    """Build a factory that imports a tool class and instantiates it"""
 
-def create_llm_provider() -> OllamaProvider | TextGenProvider:
+    def factory() -> "Tool":
+        import importlib
+
+        module = importlib.import_module(module_name, __package__)
+        return getattr(module, class_name)()
+
+    return factory
+
+
+def register_all_tools() -> None:
+    """Register all available tools"""
+    from .tools.registry import get_registry
+
+    registry = get_registry()
+    for tool_name, module_name, class_name in _TOOL_SPECS:
+        registry.register_lazy(tool_name, _tool_factory(module_name, class_name))
+
+
+def create_llm_provider() -> "LLMProvider":
     """Create LLM provider based on settings"""
+    from .config.settings import get_settings
+
     settings = get_settings()
 
+    # Only import the provider that is actually selected
     if settings.llm_provider == "ollama":
+        from .core.llm.ollama import OllamaProvider
+
         return OllamaProvider(model=settings.ollama_model, base_url=settings.ollama_url)
     elif settings.llm_provider == "textgen":
-        return TextGenProvider(
-            model=settings.textgen_model, base_url=settings.textgen_url
-        )
+        from .core.llm.textgen import TextGenProvider
+
+        return TextGenProvider(model=settings.textgen_model, base_url=settings.textgen_url)
     else:
         raise ValueError(f"Unknown LLM provider: {settings.llm_provider}")
 
 
-async def chat_loop(agent: Agent) -> None:
+# Bytes read from stdin past the last line _read_stdin_line returned
+_stdin_pending = bytearray()
+
+
+def _read_stdin_line() -> str:
+    """Read a line straight from file descriptor 0
+
+    Unlike input(), this holds no lock on sys.stdin while it blocks, so a
+    reader thread left waiting at exit can't stall interpreter shutdown.
+    """
+    while b"\n" not in _stdin_pending:
+        chunk = os.read(0, 4096)
+        if not chunk:
+            if not _stdin_pending:
+                raise EOFError
+            break
+        _stdin_pending.extend(chunk)
+
+    line, _, rest = bytes(_stdin_pending).partition(b"\n")
+    _stdin_pending[:] = rest
+    return line.decode(sys.stdin.encoding or "utf-8", errors="replace").rstrip("\r")
+
+
+async def _console_input(console: "Console", prompt: str) -> str:
+    """Show a prompt and read a line without blocking the event loop
+
+    The line is read in a daemon thread, so background tasks keep running
+    while the user types and a prompt still waiting after Ctrl+C doesn't hold
+    up exit (the loop's default executor would be joined at shutdown).
+    """
+    import asyncio
+    import threading
+
+    loop = asyncio.get_running_loop()
+    future: "asyncio.Future[str]" = loop.create_future()
+
+    def deliver(line: str | None, error: Exception | None) -> None:
+        if future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(line)
+
+    def read() -> None:
+        try:
+            line, error = _read_stdin_line(), None
+        except Exception as e:  # EOFError on Ctrl+D
+            line, error = None, e
+        try:
+            loop.call_soon_threadsafe(deliver, line, error)
+        except RuntimeError:
+            pass  # the loop closed while waiting for input
+
+    console.print(prompt, end="")
+    threading.Thread(target=read, daemon=True).start()
+    return await future
+
+
+async def chat_loop(agent: "Agent") -> None:
     """Main chat loop"""
-    settings = get_settings()
+    from .history.storage import get_history_storage
+    from .achievements.tracker import get_achievement_tracker
+    from .cli.ui import (
+        console,
+        print_help,
+        print_stats,
+        print_achievements,
+        print_error,
+        print_info,
+    )
+
     history = get_history_storage()
     achievements = get_achievement_tracker()
 
+    def clear_conversation() -> None:
+        agent.reset_conversation()
+        print_info("Conversation cleared.")
+
+    # Built once per loop; each handler takes no arguments
+    commands: Dict[str, Callable[[], None]] = {
+        "help": print_help,
+        "clear": clear_conversation,
+        "stats": lambda: print_stats(history, achievements),
+        "achievements": lambda: print_achievements(achievements),
+    }
+
+    # One prompt_toolkit session for the whole loop (line editing and history);
+    # plain console input if it isn't installed
+    try:
+        from prompt_toolkit import PromptSession
+        from prompt_toolkit.formatted_text import HTML
+
+        session = PromptSession()
+        prompt_message = HTML("\n<b><ansired>You</ansired></b>: ")
+    except ImportError:
+        session = None
+
     while True:
         try:
             # Get user input
-            user_input = Prompt.ask("\n[bold red]You[/bold red]").strip()
+            if session is not None:
+                user_input = (await session.prompt_async(prompt_message)).strip()
+            else:
+                user_input = (await _console_input(console, "\n[bold red]You[/bold red]: ")).strip()
 
             if not user_input:
                 continue
 
             # Handle commands
-            if user_input.lower() in ["exit", "quit"]:
+            cmd = user_input.lower()
+            if cmd in _EXIT_COMMANDS:
                 break
-            elif user_input.lower() == "help":
-                print_help()
-                continue
-            elif user_input.lower() == "clear":
-                agent.reset_conversation()
-                print_info("Conversation cleared.")
-                continue
-            elif user_input.lower() == "stats":
-                print_stats(history, achievements)
-                continue
-            elif user_input.lower() == "achievements":
-                print_achievements(achievements)
+
+            handler = commands.get(cmd)
+            if handler is not None:
+                handler()
                 continue
 
             # Process with agent
@@ -161,49 +303,106 @@ async def chat_loop(agent: Agent) -> None:
 
 
 @click.command()
+@click.version_option(__version__, prog_name="code-demon")
 @click.option("--model", help="Override LLM model")
 @click.option("--provider", type=click.Choice(["ollama", "textgen"]), help="LLM provider")
-@click.option("--personality", type=click.Choice(["cynical", "professional", "friendly"]), help="Agent personality")
-def main(model: str | None, provider: str | None, personality: str | None) -> None:
+@click.option(
+    "--personality",
+    type=click.Choice(["cynical", "professional", "friendly"]),
+    help="Agent personality",
+)
+@click.option(
+    "--validate-config", is_flag=True, help="Strictly validate the configuration and exit"
+)
+def main(
+    model: str | None, provider: str | None, personality: str | None, validate_config: bool
+) -> None:
     """
     Code Demon - AI Coding & Server Admin Assistant
 
     An intelligent agent for coding tasks and server administration,
     powered by local LLMs (Ollama or Text Generation WebUI).
     """
+    from .config.settings import get_settings, override_settings
+
+    if validate_config:
+        from .config.validation import validate_config as run_validation
+
+        problems = run_validation()
+        for problem in problems:
+            click.echo(f"✗ {problem}", err=True)
+        if problems:
+            sys.exit(1)
+        click.echo("✓ Configuration is valid")
+        return
+
+    # Use uvloop's faster event loop when it is installed (not available on Windows)
+    try:
+        import uvloop
+
+        uvloop.install()
+    except ImportError:
+        pass
+
     # Load settings
     settings = get_settings()
 
     # Override settings if provided
+    overrides = {}
     if model:
         if provider == "ollama" or settings.llm_provider == "ollama":
-            settings.ollama_model = model
+            overrides["ollama_model"] = model
         elif provider == "textgen" or settings.llm_provider == "textgen":
-            settings.textgen_model = model
+            overrides["textgen_model"] = model
 
     if provider:
-        settings.llm_provider = provider
+        overrides["llm_provider"] = provider
 
     if personality:
-        settings.personality = personality
+        overrides["personality"] = personality
+
+    if overrides:
+        settings = override_settings(**overrides)
+
+    from .cli.ui import (
+        console,
+        print_banner,
+        print_welcome,
+        print_goodbye,
+        print_error,
+        print_info,
+    )
 
     # Print banner
     print_banner()
 
+    # Fail fast if nothing is listening, before the agent and HTTP stack are loaded
+    llm_url = settings.ollama_url if settings.llm_provider == "ollama" else settings.textgen_url
+    print_info(f"Connecting to {settings.llm_provider}...")
+    if not _quick_tcp_probe(llm_url):
+        print_error(
+            f"{settings.llm_provider} is not responding. Make sure it's running at {llm_url}"
+        )
+        sys.exit(1)
+
+    from .core.agent import Agent
+    from .core.approval import ApprovalRequest, get_approval_system
+    from .core.memory import get_memory_system
+    from .tools.registry import get_registry
+
     # Register all tools
     register_all_tools()
 
     # Set up approval system
     approval_system = get_approval_system(settings.require_approval)
 
-    # Connect approval to tool registry
-    def approval_handler(operation: str, reason: str) -> bool:
-        from .core.approval import ApprovalRequest
+    # Connect approval to tool registry; identical requests reuse one object
+    @lru_cache(maxsize=64)
+    def make_approval_request(operation: str, reason: str) -> ApprovalRequest:
+        return ApprovalRequest(operation=operation, reason=reason, details="", dangerous=True)
 
-        request = ApprovalRequest(
-            operation=operation, reason=reason, details="", dangerous=True
-        )
-        return approval_system.request_approval(request)
+    def approval_handler(operation: str, reason: str) -> bool:
+        return approval_system.request_approval(make_approval_request(operation, reason))
 
     registry = get_registry()
     registry.set_approval_handler(approval_handler)
@@ -215,49 +414,58 @@ def main(model: str | None, provider: str | None, personality: str | None) -> No
         print_error(f"Failed to create LLM provider: {e}")
         sys.exit(1)
 
-    # Check LLM health
-    print_info(f"Connecting to {settings.llm_provider}...")
-    try:
-        is_healthy = asyncio.run(llm_provider.health_check())
+    # One event loop for the health check, memory init and the chat loop
+    with _create_runner() as runner:
+        # Check LLM health at the protocol level
+        try:
+            is_healthy = runner.run(llm_provider.health_check())
+        except Exception as e:
+            is_healthy = False
+            print_error(f"Failed to connect to {settings.llm_provider}: {e}")
+        else:
+            if not is_healthy:
+                print_error(
+                    f"{settings.llm_provider} is not responding. "
+                    f"Make sure it's running at {llm_url}"
+                )
         if not is_healthy:
-            print_error(
-                f"{settings.llm_provider} is not responding. "
-                f"Make sure it's running at {settings.ollama_url if settings.llm_provider == 'ollama' else settings.textgen_url}"
-            )
+            runner.run(llm_provider.aclose())
             sys.exit(1)
         print_info(f"Connected to {settings.llm_provider} successfully!")
-    except Exception as e:
-        print_error(f"Failed to connect to {settings.llm_provider}: {e}")
-        sys.exit(1)
 
-    # Create agent
-    agent = Agent(llm_provider)
+        # Create agent
+        agent = Agent(llm_provider)
 
-    # Start session
-    agent.start_session()
+        # Start session
+        agent.start_session()
 
-    # Print welcome
-    print_welcome(settings.personality)
+        # Print welcome
+        print_welcome(settings.personality)
 
-    # Initialize memory system (silently - it's optional)
-    try:
-        memory_system = get_memory_system()
-        asyncio.run(memory_system.initialize())
-    except Exception:
-        # Silently fail - memory is optional
-        pass
+        # Initialize memory system (silently - it's optional)
+        try:
+            memory_system = get_memory_system()
+            runner.run(memory_system.initialize())
+        except Exception:
+            # Silently fail - memory is optional
+            pass
 
-    # Run chat loop
-    try:
-        asyncio.run(chat_loop(agent))
-    except KeyboardInterrupt:
-        console.print()
-    finally:
-        # End session
-        print_goodbye()
-        agent.end_session(success=True)
+        # Run chat loop
+        try:
+            runner.run(chat_loop(agent))
+        except KeyboardInterrupt:
+            console.print()
+        finally:
+            # Flush background memory writes while the loop is still open
+            try:
+                runner.run(agent.shutdown())
+            except Exception:
+                pass
+
+            # End session
+            print_goodbye()
+            agent.end_session(success=True)
 
 
 if __name__ == "__main__":
     main()
-
@@ -262,20 +262,26 @@ ACHIEVEMENTS = [
 ]
 
 
+# Lookup tables built once at import
+_BY_ID: dict[str, Achievement] = {a.id: a for a in ACHIEVEMENTS}
+_BY_CATEGORY: dict[AchievementCategory, list[Achievement]] = {}
+_BY_RARITY: dict[AchievementRarity, list[Achievement]] = {}
+for _achievement in ACHIEVEMENTS:
+    _BY_CATEGORY.setdefault(_achievement.category, []).append(_achievement)
+    _BY_RARITY.setdefault(_achievement.rarity, []).append(_achievement)
+del _achievement
+
+
 def get_achievement_by_id(achievement_id: str) -> Achievement | None:
     """Get achievement by ID"""
-    for achievement in ACHIEVEMENTS:
-        if achievement.id == achievement_id:
-            return achievement
-    return None
+    return _BY_ID.get(achievement_id)
 
 
 def get_achievements_by_category(category: AchievementCategory) -> list[Achievement]:
     """Get all achievements in a category"""
-    return [a for a in ACHIEVEMENTS if a.category == category]
+    return list(_BY_CATEGORY.get(category, ()))
 
 
 def get_achievements_by_rarity(rarity: AchievementRarity) -> list[Achievement]:
     """Get all achievements of a rarity"""
-    return [a for a in ACHIEVEMENTS if a.rarity == rarity]
-
+    return list(_BY_RARITY.get(rarity, ()))
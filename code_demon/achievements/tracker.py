@@ -4,11 +4,55 @@ Achievement Tracker
 Track and award achievements
 """
 
-import json
+import atexit
+import os
 from pathlib import Path
 from datetime import datetime
-from typing import Dict, List, Set
-from .definitions import Achievement, ACHIEVEMENTS, get_achievement_by_id
+from typing import Dict, List, Optional, Set
+from .definitions import Achievement, ACHIEVEMENTS, _BY_ID
+from ..utils import json_compat
+
+
+# Achievement ID -> (stat name, threshold the stat has to reach)
+_REQUIREMENTS: Dict[str, tuple[str, int]] = {
+    # Session-based
+    "first_blood": ("sessions_completed", 1),
+    "veteran": ("sessions_completed", 50),
+    "legend": ("sessions_completed", 100),
+    # Tool-based
+    "first_tool": ("tools_used", 1),
+    "tool_enthusiast": ("unique_tools_used", 10),
+    "tool_master": ("all_tools_used", 1),
+    "demon_master": ("tools_used", 1000),
+    # Git-based
+    "first_commit": ("git_commits", 1),
+    "commit_master": ("git_commits", 50),
+    "git_guru": ("git_tools_used", 5),
+    "merge_master": ("git_merges", 50),
+    # File-based
+    "file_editor": ("files_edited", 10),
+    "code_surgeon": ("files_edited", 100),
+    # Code-based
+    "bug_hunter": ("bugs_fixed", 50),
+    "test_warrior": ("tests_run", 100),
+    "refactor_king": ("refactorings", 100),
+    "code_master": ("lines_written", 1000),
+    # Special
+    "night_owl": ("night_sessions", 10),
+    "speed_demon": ("fast_sessions", 1),
+    "marathon_runner": ("long_sessions", 1),
+    "perfectionist": ("consecutive_successes", 10),
+    "friday_13th": ("friday_13th_sessions", 1),
+    "immortal": ("days_active", 365),
+}
+
+# Stat name -> achievements gated on it, in definition order
+_STAT_TO_ACHIEVEMENTS: Dict[str, List[Achievement]] = {}
+for _achievement in ACHIEVEMENTS:
+    if _achievement.id in _REQUIREMENTS:
+        _stat = _REQUIREMENTS[_achievement.id][0]
+        _STAT_TO_ACHIEVEMENTS.setdefault(_stat, []).append(_achievement)
+del _achievement, _stat
 
 
 class AchievementTracker:
@@ -22,172 +66,198 @@ class AchievementTracker:
         self.earned: Set[str] = set()
         self.progress: Dict[str, int] = {}
         self.stats: Dict[str, int] = {}
+        self._points_cache: Optional[int] = None
+        self._file_mtime: Optional[int] = None  # st_mtime_ns of the file we last read/wrote
         self._load()
 
+        # Set mirror of stats["unique_tools_list"] for O(1) membership checks
+        self._unique_tools: Set[str] = set(self.stats.get("unique_tools_list", []))
+
+        # Changes are batched and written once per logical operation
+        self._dirty = False
+        atexit.register(self._flush)
+
+        # Achievements unlocked by stat changes, handed out by check_and_award
+        self._pending: List[Achievement] = []
+        for stat_name in _STAT_TO_ACHIEVEMENTS:
+            self._check_stat(stat_name)
+
     def _load(self) -> None:
         """Load progress from disk"""
-        if not self.storage_file.exists():
+        try:
+            mtime = self.storage_file.stat().st_mtime_ns
+        except OSError:
             return
 
         try:
-            with open(self.storage_file, "r") as f:
-                data = json.load(f)
-                self.earned = set(data.get("earned", []))
-                self.progress = data.get("progress", {})
-                self.stats = data.get("stats", {})
+            data = json_compat.loads(self.storage_file.read_bytes())
+            self.earned = set(data.get("earned", []))
+            self.progress = data.get("progress", {})
+            self.stats = data.get("stats", {})
+            self._points_cache = None
+            self._file_mtime = mtime
         except Exception:
             pass
 
-    def _save(self) -> None:
-        """Save progress to disk"""
+    def reload_if_changed(self) -> bool:
+        """
+        Reload progress if the file was modified since we last read or wrote it
+
+        Unsaved in-memory changes take precedence, so nothing is reloaded
+        while the tracker is dirty.
+
+        Returns:
+            True if progress was reloaded from disk
+        """
+        if self._dirty:
+            return False
+
+        try:
+            mtime = self.storage_file.stat().st_mtime_ns
+        except OSError:
+            return False
+
+        if mtime == self._file_mtime:
+            return False
+
+        self._load()
+        self._unique_tools = set(self.stats.get("unique_tools_list", []))
+        return True
+
+    def _flush(self) -> None:
+        """Save progress to disk if anything changed"""
+        if not self._dirty:
+            return
+
+        if self._unique_tools:
+            self.stats["unique_tools_list"] = sorted(self._unique_tools)
+
         data = {
-            "earned": list(self.earned),
+            "earned": sorted(self.earned),
             "progress": self.progress,
             "stats": self.stats,
         }
-        with open(self.storage_file, "w") as f:
-            json.dump(data, f, indent=2)
 
-    def increment_stat(self, stat_name: str, amount: int = 1) -> None:
-        """Increment a stat"""
-        self.stats[stat_name] = self.stats.get(stat_name, 0) + amount
-        self._save()
+        # Write to a temp file and swap it in, so a crash never leaves a partial file
+        tmp_file = self.storage_file.with_name(self.storage_file.name + ".tmp")
+        tmp_file.write_bytes(json_compat.dumps(data))
+        os.replace(tmp_file, self.storage_file)
+        self._file_mtime = self.storage_file.stat().st_mtime_ns
+        self._dirty = False
+
+    def _inc(self, stat_name: str, amount: int = 1) -> int:
+        """Increment a stat without writing to disk, returning the new value"""
+        value = self.stats.get(stat_name, 0) + amount
+        self.stats[stat_name] = value
+        self._dirty = True
+        self._check_stat(stat_name)
+        return value
+
+    def _check_stat(self, stat_name: str) -> None:
+        """Queue achievements gated on a stat that has reached its threshold"""
+        for achievement in _STAT_TO_ACHIEVEMENTS.get(stat_name, ()):
+            if achievement.id not in self.earned and self._check_achievement(achievement):
+                self.earned.add(achievement.id)
+                self._pending.append(achievement)
+                self._points_cache = None
+                self._dirty = True
+
+    def increment_stat(self, stat_name: str, amount: int = 1) -> int:
+        """Increment a stat (written on the next check_and_award) and return its new value"""
+        return self._inc(stat_name, amount)
+
+    def has_pending(self) -> bool:
+        """Check if stat changes have unlocked achievements not yet handed out"""
+        return bool(self._pending)
 
     def get_stat(self, stat_name: str) -> int:
         """Get a stat value"""
         return self.stats.get(stat_name, 0)
 
-    def check_and_award(self) -> List[Achievement]:
-        """Check for new achievements and award them"""
-        newly_earned = []
+    def check_and_award(self, stat_name: Optional[str] = None) -> List[Achievement]:
+        """
+        Award achievements unlocked since the last call
 
-        for achievement in ACHIEVEMENTS:
-            if achievement.id in self.earned:
-                continue
+        Stat changes already check the achievements gated on them, so this
+        only hands out what they queued and saves progress.
 
-            if self._check_achievement(achievement):
-                self.earned.add(achievement.id)
-                newly_earned.append(achievement)
+        Args:
+            stat_name: Also re-check achievements gated on this stat
+                (for stats that were changed directly)
+
+        Returns:
+            Newly earned achievements
+        """
+        if stat_name is not None:
+            self._check_stat(stat_name)
 
-        if newly_earned:
-            self._save()
+        newly_earned, self._pending = self._pending, []
 
+        self._flush()
         return newly_earned
 
     def _check_achievement(self, achievement: Achievement) -> bool:
         """Check if an achievement should be awarded"""
-        # Session-based
-        if achievement.id == "first_blood":
-            return self.get_stat("sessions_completed") >= 1
-        if achievement.id == "veteran":
-            return self.get_stat("sessions_completed") >= 50
-        if achievement.id == "legend":
-            return self.get_stat("sessions_completed") >= 100
-
-        # Tool-based
-        if achievement.id == "first_tool":
-            return self.get_stat("tools_used") >= 1
-        if achievement.id == "tool_enthusiast":
-            return self.get_stat("unique_tools_used") >= 10
-        if achievement.id == "tool_master":
-            return self.get_stat("all_tools_used") >= 1
-        if achievement.id == "demon_master":
-            return self.get_stat("tools_used") >= 1000
-
-        # Git-based
-        if achievement.id == "first_commit":
-            return self.get_stat("git_commits") >= 1
-        if achievement.id == "commit_master":
-            return self.get_stat("git_commits") >= 50
-        if achievement.id == "git_guru":
-            return self.get_stat("git_tools_used") >= 5
-        if achievement.id == "merge_master":
-            return self.get_stat("git_merges") >= 50
-
-        # File-based
-        if achievement.id == "file_editor":
-            return self.get_stat("files_edited") >= 10
-        if achievement.id == "code_surgeon":
-            return self.get_stat("files_edited") >= 100
-
-        # Code-based
-        if achievement.id == "bug_hunter":
-            return self.get_stat("bugs_fixed") >= 50
-        if achievement.id == "test_warrior":
-            return self.get_stat("tests_run") >= 100
-        if achievement.id == "refactor_king":
-            return self.get_stat("refactorings") >= 100
-        if achievement.id == "code_master":
-            return self.get_stat("lines_written") >= 1000
-
-        # Special
-        if achievement.id == "night_owl":
-            return self.get_stat("night_sessions") >= 10
-        if achievement.id == "speed_demon":
-            return self.get_stat("fast_sessions") >= 1
-        if achievement.id == "marathon_runner":
-            return self.get_stat("long_sessions") >= 1
-        if achievement.id == "perfectionist":
-            return self.get_stat("consecutive_successes") >= 10
-        if achievement.id == "friday_13th":
-            return self.get_stat("friday_13th_sessions") >= 1
-        if achievement.id == "immortal":
-            return self.get_stat("days_active") >= 365
-
-        return False
+        requirement = _REQUIREMENTS.get(achievement.id)
+        if requirement is None:
+            return False
+
+        stat, threshold = requirement
+        return self.stats.get(stat, 0) >= threshold
 
     def get_earned_achievements(self) -> List[Achievement]:
         """Get all earned achievements"""
-        return [get_achievement_by_id(aid) for aid in self.earned if get_achievement_by_id(aid)]
+        return [_BY_ID[aid] for aid in self.earned if aid in _BY_ID]
 
     def get_total_points(self) -> int:
         """Get total points from earned achievements"""
-        return sum(a.points for a in self.get_earned_achievements())
+        if self._points_cache is None:
+            self._points_cache = sum(
+                _BY_ID[aid].points for aid in self.earned if aid in _BY_ID
+            )
+        return self._points_cache
 
     def get_progress_percentage(self) -> float:
         """Get overall achievement completion percentage"""
         return (len(self.earned) / len(ACHIEVEMENTS)) * 100
 
     def mark_tool_used(self, tool_name: str) -> None:
-        """Mark a tool as used"""
-        self.increment_stat("tools_used")
+        """Mark a tool as used (written on the next check_and_award)"""
+        self._inc("tools_used")
 
         # Track unique tools
-        unique_tools = self.stats.get("unique_tools_list", [])
-        if tool_name not in unique_tools:
-            unique_tools.append(tool_name)
-            self.stats["unique_tools_list"] = unique_tools
-            self.stats["unique_tools_used"] = len(unique_tools)
-
-        self._save()
+        if tool_name not in self._unique_tools:
+            self._unique_tools.add(tool_name)
+            self.stats["unique_tools_used"] = len(self._unique_tools)
+            self._check_stat("unique_tools_used")
 
     def mark_session_completed(self, success: bool, duration_minutes: float) -> None:
         """Mark a session as completed"""
-        self.increment_stat("sessions_completed")
+        self._inc("sessions_completed")
 
         if success:
-            self.increment_stat("successful_sessions")
-            self.increment_stat("consecutive_successes")
+            self._inc("successful_sessions")
+            self._inc("consecutive_successes")
         else:
             self.stats["consecutive_successes"] = 0
 
         # Check duration
         if duration_minutes > 30:
-            self.increment_stat("long_sessions")
+            self._inc("long_sessions")
         if duration_minutes < 1:
-            self.increment_stat("fast_sessions")
-
-        # Check time of day
-        hour = datetime.now().hour
-        if 0 <= hour < 6:
-            self.increment_stat("night_sessions")
+            self._inc("fast_sessions")
 
-        # Check Friday 13th
+        # Check time of day and date
         now = datetime.now()
-        if now.weekday() == 4 and now.day == 13:
-            self.increment_stat("friday_13th_sessions")
+        if 0 <= now.hour < 6:
+            self._inc("night_sessions")
+
+        is_friday_13th = now.weekday() == 4 and now.day == 13
+        if is_friday_13th:
+            self._inc("friday_13th_sessions")
 
-        self._save()
+        self._dirty = True
+        self._flush()
 
 
 # Global tracker instance
@@ -205,7 +275,12 @@ def get_achievement_tracker(storage_file: Path | None = None) -> AchievementTrac
 
 
 def reset_achievement_tracker() -> None:
-    """Reset the global tracker"""
+    """Reset the global tracker (saving its unsaved progress first)"""
     global _tracker
+    if _tracker is not None:
+        # Otherwise its exit-time flush would run after the new tracker's and
+        # overwrite it with stale progress
+        atexit.unregister(_tracker._flush)
+        _tracker._flush()
     _tracker = None
 
@@ -0,0 +1,15 @@
+"""
+Shared Console
+
+Single Rich console used across the CLI and core modules
+"""
+
+from functools import cache
+
+from rich.console import Console
+
+
+@cache
+def get_console() -> Console:
+    """Get the shared console (created on first use)"""
+    return Console()
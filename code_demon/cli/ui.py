@@ -4,17 +4,27 @@ Terminal UI Components
 Rich-based UI elements for the CLI
 """
 
-from rich.console import Console
+from functools import cache
+
+from .console import get_console
 from rich.panel import Panel
 from rich.text import Text
 from rich.table import Table
 
-console = Console()
+console = get_console()
 
 
-def print_banner() -> None:
-    """Print the code-demon banner"""
-    banner = """
+@cache
+def _phrases():
+    """Import the phrases module on first use"""
+    from ..personality import phrases
+
+    return phrases
+
+
+# Static renderables are built once at import instead of on every call
+_BANNER_TEXT = Text(
+    """
   ╔═══════════════════════════════════════════╗
   ║                                           ║
   ║   ██████╗ ██████╗ ██████╗ ███████╗       ║
@@ -32,42 +42,20 @@ def print_banner() -> None:
   ║  ╚═════╝ ╚══════╝╚═╝     ╚═╝ ╚═════╝ ╚═╝  ╚══╝
   ║                                           ║
   ╚═══════════════════════════════════════════╝
-    """
-    console.print(banner, style="bold red")
-    console.print(
-        "  [dim]Your AI Coding & Server Admin Assistant[/dim]\n", justify="center"
-    )
+    """,
+    style="bold red",
+)
 
+_TAGLINE_TEXT = Text.from_markup("  [dim]Your AI Coding & Server Admin Assistant[/dim]\n")
 
-def print_welcome(personality: str) -> None:
-    """Print welcome message"""
-    from ..personality.phrases import get_greeting
+_WELCOME_TEMPLATE = (
+    "[bold]{greeting}[/bold]\n\n"
+    "Personality: [cyan]{personality}[/cyan]\n"
+    "Type your request or 'help' for commands.\n"
+    "Type 'exit' or 'quit' to end the session."
+)
 
-    greeting = get_greeting()
-
-    panel = Panel(
-        f"[bold]{greeting}[/bold]\n\n"
-        f"Personality: [cyan]{personality}[/cyan]\n"
-        f"Type your request or 'help' for commands.\n"
-        f"Type 'exit' or 'quit' to end the session.",
-        title="[red]Welcome[/red]",
-        border_style="red",
-    )
-    console.print(panel)
-    console.print()
-
-
-def print_goodbye() -> None:
-    """Print goodbye message"""
-    from ..personality.phrases import get_goodbye
-
-    goodbye = get_goodbye()
-    console.print(f"\n[red]{goodbye}[/red]\n")
-
-
-def print_help() -> None:
-    """Print help information"""
-    help_text = """[bold]Available Commands:[/bold]
+_HELP_TEXT = """[bold]Available Commands:[/bold]
 
 [yellow]help[/yellow]          Show this help message
 [yellow]exit/quit[/yellow]     End the session
@@ -90,7 +78,36 @@ def print_help() -> None:
 • "Commit these changes with message 'fix: resolve issue'"
 • "Run the tests"
 """
-    console.print(Panel(help_text, title="[red]Code Demon Help[/red]", border_style="red"))
+
+_HELP_PANEL = Panel(_HELP_TEXT, title="[red]Code Demon Help[/red]", border_style="red")
+
+
+def print_banner() -> None:
+    """Print the code-demon banner"""
+    console.print(_BANNER_TEXT)
+    console.print(_TAGLINE_TEXT, justify="center")
+
+
+def print_welcome(personality: str) -> None:
+    """Print welcome message"""
+    panel = Panel(
+        _WELCOME_TEMPLATE.format(greeting=_phrases().get_greeting(), personality=personality),
+        title="[red]Welcome[/red]",
+        border_style="red",
+    )
+    console.print(panel)
+    console.print()
+
+
+def print_goodbye() -> None:
+    """Print goodbye message"""
+    goodbye = _phrases().get_goodbye()
+    console.print(f"\n[red]{goodbye}[/red]\n")
+
+
+def print_help() -> None:
+    """Print help information"""
+    console.print(_HELP_PANEL)
 
 
 def print_stats(history_storage, achievement_tracker) -> None:
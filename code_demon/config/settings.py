@@ -5,63 +5,82 @@ Handles environment variables and application settings
 """
 
 import os
+import re
+from dataclasses import dataclass, field, fields, replace
+from functools import lru_cache
 from pathlib import Path
-from typing import Literal
-from pydantic_settings import BaseSettings
-from pydantic import Field
-
-
-class Settings(BaseSettings):
-    """Application settings loaded from environment variables"""
+from typing import Any, Dict, Literal, get_args, get_origin
+
+# Optional .env file in the working directory (real environment variables win)
+ENV_FILE = ".env"
+
+_TRUE_VALUES = frozenset({"1", "true", "yes", "on", "y", "t"})
+_FALSE_VALUES = frozenset({"0", "false", "no", "off", "n", "f"})
+
+# .env value syntax (as in python-dotenv)
+_SINGLE_QUOTED = re.compile(r"'((?:\\'|[^'])*)'")
+_DOUBLE_QUOTED = re.compile(r'"((?:\\"|[^"])*)"')
+_SINGLE_QUOTED_ESCAPE = re.compile(r"\\([\\'])")
+_DOUBLE_QUOTED_ESCAPE = re.compile(r'\\([\\\'"abfnrtv])')
+_ESCAPES = {
+    "\\": "\\",
+    "'": "'",
+    '"': '"',
+    "a": "\a",
+    "b": "\b",
+    "f": "\f",
+    "n": "\n",
+    "r": "\r",
+    "t": "\t",
+    "v": "\v",
+}
+_INLINE_COMMENT = re.compile(r"\s+#.*")
+
+
+@dataclass(slots=True, frozen=True)
+class SettingsSnapshot:
+    """Immutable application settings, built once from the environment"""
 
     # LLM Provider
-    llm_provider: Literal["ollama", "textgen"] = Field(default="ollama")
-    ollama_url: str = Field(default="http://localhost:11434")
-    ollama_model: str = Field(default="gpt-oss:20b")
-    textgen_url: str = Field(default="http://localhost:5000")
-    textgen_model: str = Field(default="default")
+    llm_provider: Literal["ollama", "textgen"] = "ollama"
+    ollama_url: str = "http://localhost:11434"
+    ollama_model: str = "gpt-oss:20b"
+    textgen_url: str = "http://localhost:5000"
+    textgen_model: str = "default"
 
     # Features
-    require_approval: bool = Field(default=True)
-    achievements_enabled: bool = Field(default=True)
-    history_enabled: bool = Field(default=True)
-    memory_enabled: bool = Field(default=False)  # Disabled by default (requires Cognee LLM API key)
+    require_approval: bool = True
+    achievements_enabled: bool = True
+    history_enabled: bool = True
+    memory_enabled: bool = False  # Disabled by default (requires Cognee LLM API key)
 
     # Personality
-    personality: Literal["cynical", "professional", "friendly"] = Field(default="cynical")
+    personality: Literal["cynical", "professional", "friendly"] = "cynical"
 
     # Logging
-    log_level: str = Field(default="INFO")
-    log_file: str = Field(default="~/.code-demon/logs/demon.log")
+    log_level: str = "INFO"
+    log_file: str = "~/.code-demon/logs/demon.log"
 
     # Storage
-    history_dir: str = Field(default="~/.code-demon/history")
-    achievements_file: str = Field(default="~/.code-demon/achievements.json")
+    history_dir: str = "~/.code-demon/history"
+    achievements_file: str = "~/.code-demon/achievements.json"
 
     # Security
-    max_tool_depth: int = Field(default=10)
-    max_conversation_length: int = Field(default=50)
-    tool_timeout: int = Field(default=30)
-
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
-        case_sensitive = False
-
-    @property
-    def expanded_log_file(self) -> Path:
-        """Expand ~ in log file path"""
-        return Path(self.log_file).expanduser()
-
-    @property
-    def expanded_history_dir(self) -> Path:
-        """Expand ~ in history dir path"""
-        return Path(self.history_dir).expanduser()
-
-    @property
-    def expanded_achievements_file(self) -> Path:
-        """Expand ~ in achievements file path"""
-        return Path(self.achievements_file).expanduser()
+    max_tool_depth: int = 10
+    max_conversation_length: int = 50
+    tool_timeout: int = 30
+
+    # Paths with ~ expanded, derived from the fields above
+    expanded_log_file: Path = field(init=False)
+    expanded_history_dir: Path = field(init=False)
+    expanded_achievements_file: Path = field(init=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "expanded_log_file", Path(self.log_file).expanduser())
+        object.__setattr__(self, "expanded_history_dir", Path(self.history_dir).expanduser())
+        object.__setattr__(
+            self, "expanded_achievements_file", Path(self.achievements_file).expanduser()
+        )
 
     def ensure_dirs(self) -> None:
         """Create necessary directories"""
@@ -70,23 +89,120 @@ class Settings(BaseSettings):
         self.expanded_achievements_file.parent.mkdir(parents=True, exist_ok=True)
 
 
-# Global settings instance
-_settings: Settings | None = None
+# Settings overridden at runtime (e.g. by CLI flags); None means use the loaded ones
+_settings: SettingsSnapshot | None = None
+
+
+def _parse_env_value(value: str) -> str:
+    """Parse the value part of a .env line the way python-dotenv does
+
+    Quoted values end at the matching unescaped quote; double-quoted ones
+    also decode backslash escapes. Unquoted values lose a trailing comment
+    (whitespace, then #).
+    """
+    quote = value[:1]
+    if quote in ("'", '"'):
+        match = (_SINGLE_QUOTED if quote == "'" else _DOUBLE_QUOTED).match(value)
+        if match:
+            inner = match.group(1)
+            if quote == "'":
+                return _SINGLE_QUOTED_ESCAPE.sub(r"\1", inner)
+            return _DOUBLE_QUOTED_ESCAPE.sub(lambda m: _ESCAPES[m.group(1)], inner)
+
+    return _INLINE_COMMENT.sub("", value).rstrip()
+
+
+def _read_env_file(path: str) -> Dict[str, str]:
+    """Read KEY=VALUE lines from a .env file (keys lowercased)"""
+    values: Dict[str, str] = {}
+    try:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#") or "=" not in line:
+                    continue
+                key, _, value = line.removeprefix("export ").partition("=")
+                values[key.strip().lower()] = _parse_env_value(value.strip())
+    except FileNotFoundError:
+        pass
+    return values
+
+
+def _coerce(name: str, annotation: Any, raw: str) -> Any:
+    """Convert a raw environment string to a settings field's type"""
+    value = raw.strip()
+
+    if annotation is bool:
+        lowered = value.lower()
+        if lowered in _TRUE_VALUES:
+            return True
+        if lowered in _FALSE_VALUES:
+            return False
+        raise ValueError(f"Invalid boolean for {name.upper()}: {raw!r}")
+
+    if annotation is int:
+        try:
+            return int(value)
+        except ValueError:
+            raise ValueError(f"Invalid integer for {name.upper()}: {raw!r}") from None
+
+    if get_origin(annotation) is Literal:
+        choices = get_args(annotation)
+        if value not in choices:
+            raise ValueError(
+                f"Invalid value for {name.upper()}: {raw!r} (expected one of {', '.join(choices)})"
+            )
+        return value
+
+    return raw
+
+
+def _read_environment(env_file: str = ENV_FILE) -> Dict[str, str]:
+    """Collect raw settings values from the .env file and environment variables"""
+    raw = _read_env_file(env_file)
+    raw.update((key.lower(), value) for key, value in os.environ.items())
+    return raw
+
+
+@lru_cache(maxsize=1)
+def _load_settings() -> SettingsSnapshot:
+    """Read the environment once and freeze it into a snapshot"""
+    raw = _read_environment()
+    values = {
+        f.name: _coerce(f.name, f.type, raw[f.name])
+        for f in fields(SettingsSnapshot)
+        if f.init and f.name in raw
+    }
+    settings = SettingsSnapshot(**values)
+    settings.ensure_dirs()
+    return settings
+
+
+def get_settings() -> SettingsSnapshot:
+    """Get the global settings instance"""
+    if _settings is not None:
+        return _settings
+    return _load_settings()
 
 
-def get_settings() -> Settings:
-    """Get the global settings instance"""
-    global _settings
-    if _settings is None:
-        _settings = Settings()
-        _settings.ensure_dirs()
-    return _settings
+def override_settings(**changes: Any) -> SettingsSnapshot:
+    """
+    Replace the global settings with a copy that has some fields changed
 
+    Args:
+        **changes: Field values to change
 
-def reload_settings() -> Settings:
-    """Reload settings from environment"""
+    Returns:
+        The new global settings
+    """
     global _settings
-    _settings = Settings()
-    _settings.ensure_dirs()
+    _settings = replace(get_settings(), **changes)
     return _settings
 
+
+def reload_settings() -> SettingsSnapshot:
+    """Reload settings from environment (drops any overrides)"""
+    global _settings
+    _settings = None
+    _load_settings.cache_clear()
+    return get_settings()
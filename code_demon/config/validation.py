@@ -0,0 +1,49 @@
+"""
+Configuration Validation
+
+Strict pydantic validation of the environment, used by --validate-config
+"""
+
+from dataclasses import fields
+from typing import List
+
+from pydantic import ValidationError, create_model
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+from .settings import ENV_FILE, SettingsSnapshot
+
+
+class _EnvSettings(BaseSettings):
+    """Reads environment variables and .env like the settings loader does"""
+
+    model_config = SettingsConfigDict(
+        env_file=ENV_FILE,
+        env_file_encoding="utf-8",
+        case_sensitive=False,
+        extra="ignore",
+    )
+
+
+# Same fields and defaults as SettingsSnapshot
+ValidatedSettings = create_model(
+    "ValidatedSettings",
+    __base__=_EnvSettings,
+    **{f.name: (f.type, f.default) for f in fields(SettingsSnapshot) if f.init},
+)
+
+
+def validate_config() -> List[str]:
+    """
+    Validate the environment against the settings schema
+
+    Returns:
+        List of problems (empty if the configuration is valid)
+    """
+    try:
+        ValidatedSettings()
+    except ValidationError as e:
+        return [
+            f"{'.'.join(str(part) for part in error['loc']).upper()}: {error['msg']}"
+            for error in e.errors()
+        ]
+    return []
@@ -4,7 +4,27 @@ Core Package
 Agent, LLM providers, and conversation management
 """
 
-from .agent import Agent
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .agent import Agent
+
+# Resolved on first access (PEP 562) so importing a provider module does not
+# load the whole agent stack
+_LAZY_ATTRS = {
+    "Agent": ".agent",
+}
 
 __all__ = ["Agent"]
 
+
+def __getattr__(name: str) -> Any:
+    """Import lazily exported attributes on first access"""
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
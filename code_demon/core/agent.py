@@ -5,21 +5,36 @@ Orchestrates LLM, tools, conversation management, and achievements
 """
 
 import asyncio
-from typing import List, Optional
+import time
+from collections import deque
+from typing import Callable, Deque, Dict, List, Optional, Sequence, Tuple, Union
 from datetime import datetime
 
 from .llm.base import LLMProvider, Message, MessageRole, ToolDefinition, ToolCall
 from ..tools.registry import get_registry, ToolRegistry
+from ..tools.execution.forkserver import aclose_fork_server
 from ..history.storage import get_history_storage, HistoryStorage
-from ..history.types import ToolCallRecord, MessageRole as HistoryMessageRole
+from ..history.types import MessageRecord, ToolCallRecord, MessageRole as HistoryMessageRole
 from ..achievements.tracker import get_achievement_tracker, AchievementTracker
 from .memory import get_memory_system
 from ..personality.prompts import get_system_prompt
 from ..personality.phrases import get_greeting, get_success_message
 from ..config.settings import get_settings
-from rich.console import Console
+from ..cli.console import get_console
 
-console = Console()
+console = get_console()
+
+# Tool name -> achievement stats bumped when it runs; other git_* tools count
+# towards git_tools_used (git_commit only counts as a commit)
+_TOOL_STATS: Dict[str, Tuple[str, ...]] = {
+    "git_commit": ("git_commits",),
+    "edit_file": ("files_edited",),
+}
+_GIT_TOOL_STATS: Tuple[str, ...] = ("git_tools_used",)
+_GIT_PREFIXES: Tuple[str, ...] = ("git_",)
+
+# What the background history writer stores
+HistoryRecord = Union[MessageRecord, ToolCallRecord]
 
 
 class Agent:
@@ -38,11 +53,47 @@ class Agent:
         self.achievements = achievement_tracker or get_achievement_tracker()
         self.settings = get_settings()
 
-        # Conversation state
-        self.messages: List[Message] = []
+        # Feature flags are read on every message and tool call
+        self._history_enabled = self.settings.history_enabled
+        self._achievements_enabled = self.settings.achievements_enabled
+        self._memory_enabled = self.settings.memory_enabled
+        self._memory = get_memory_system() if self._memory_enabled else None
+
+        # Conversation state: the system prompt plus the recent messages, trimmed
+        # to max_conversation_length between turns (never during one)
         self.max_conversation_length = self.settings.max_conversation_length
+        self._system: Optional[Message] = None
+        self._tail: Deque[Message] = deque()
+        # Memory context for the current turn only; never stored in the conversation
+        self._context: Optional[Message] = None
         self.max_tool_depth = self.settings.max_tool_depth
 
+        # Follow-up steps for successful tool calls, chosen once from the feature flags
+        self._tool_hooks: List[Callable[[ToolCall, str], None]] = []
+        if self._achievements_enabled:
+            self._tool_hooks.append(self._track_tool_achievements)
+        if self._memory_enabled:
+            self._tool_hooks.append(self._index_tool_result)
+
+        # Texts waiting to be indexed in memory, written in batches by a
+        # background task so memory latency stays out of the tool loop
+        self._memory_queue: Optional["asyncio.Queue[str]"] = None
+        self._memory_writer: Optional[asyncio.Task] = None
+
+        # Caps how many read-only tool calls run at once
+        self._tool_semaphore = asyncio.Semaphore(self.max_tool_depth)
+
+        # Tool call records of the batch in flight, handed to history in one go
+        self._pending_tool_records: List[ToolCallRecord] = []
+
+        # History records waiting to be stored, written in batches by a background
+        # task so journal writes stay off the event loop
+        self._history_queue: Optional["asyncio.Queue[HistoryRecord]"] = None
+        self._history_writer: Optional[asyncio.Task] = None
+
+        # Tool definitions for the LLM, cached with the registry version they came from
+        self._tools_cache: Optional[Tuple[Tuple[ToolDefinition, ...], int]] = None
+
         # Token tracking
         self.total_tokens = 0
         self.total_responses = 0
@@ -58,7 +109,13 @@ class Agent:
         tools_info = self._generate_tools_reference()
         enhanced_prompt = f"{system_prompt}\n\n{tools_info}"
 
-        self.messages.append(Message(role=MessageRole.SYSTEM, content=enhanced_prompt))
+        self._system = Message(role=MessageRole.SYSTEM, content=enhanced_prompt)
+
+    @property
+    def messages(self) -> List[Message]:
+        """Current conversation, system prompt (and memory context) first"""
+        head = [m for m in (self._system, self._context) if m is not None]
+        return [*head, *self._tail]
 
     def _generate_tools_reference(self) -> str:
         """Generate a reference list of available tools"""
@@ -101,50 +158,76 @@ class Agent:
         Returns:
             Agent's response
         """
-        # Check memory for context
-        full_message = user_message
-        if self.settings.memory_enabled:
-            memory = get_memory_system()
-            results = await memory.search(user_message)
+        # Check memory for context (sent with this turn only)
+        if self._memory_enabled:
+            results = await self._memory.search(user_message)
             if results:
-                context = "\n\n[Memory Context]\n" + "\n".join(results)
-                full_message += context
+                self._context = Message(
+                    role=MessageRole.SYSTEM,
+                    content="[Memory Context]\n" + "\n".join(results),
+                )
                 console.print(f"  [dim]Found {len(results)} relevant memories[/dim]")
 
         # Add user message to conversation
-        self.messages.append(Message(role=MessageRole.USER, content=full_message))
+        self._tail.append(Message(role=MessageRole.USER, content=user_message))
 
         # Track in history
-        if self.settings.history_enabled:
-            self.history.add_message(HistoryMessageRole.USER, user_message)
+        if self._history_enabled:
+            self._queue_history(
+                MessageRecord(HistoryMessageRole.USER, user_message, datetime.now())
+            )
 
         # Get tools for LLM
         tools = self._get_tools_for_llm()
 
         # Process with tool calling loop
-        response_text = await self._process_with_tools(tools)
+        try:
+            response_text = await self._process_with_tools(tools)
+        finally:
+            self._context = None
 
         # Add assistant response to conversation
-        self.messages.append(Message(role=MessageRole.ASSISTANT, content=response_text))
+        self._tail.append(Message(role=MessageRole.ASSISTANT, content=response_text))
+        self._trim_conversation()
 
         # Track in history
-        if self.settings.history_enabled:
-            self.history.add_message(HistoryMessageRole.ASSISTANT, response_text)
-
-        # Trim conversation if too long
-        self._trim_conversation()
+        if self._history_enabled:
+            self._queue_history(
+                MessageRecord(HistoryMessageRole.ASSISTANT, response_text, datetime.now())
+            )
 
         return response_text
 
-    async def _process_with_tools(self, tools: List[ToolDefinition]) -> str:
+    async def _process_with_tools(self, tools: Sequence[ToolDefinition]) -> str:
         """Process LLM response with tool calling loop"""
         depth = 0
         final_response = ""
         last_response = None
 
         while depth < self.max_tool_depth:
-            # Call LLM
-            response = await self.llm.chat(self.messages, tools)
+            # Stream the LLM response; leading read-only tool calls start as soon
+            # as they are parsed, while the rest of the response is still
+            # generated. Anything after the first other call waits its turn.
+            response = None
+            tool_calls: List[ToolCall] = []
+            started: Dict[int, asyncio.Task] = {}
+            try:
+                async for kind, payload in self.llm.stream_chat_structured(self.messages, tools):
+                    if kind == "tool_call":
+                        if len(started) == len(tool_calls) and self._is_read_only(payload):
+                            started[len(tool_calls)] = asyncio.create_task(
+                                self._execute_limited(payload)
+                            )
+                        tool_calls.append(payload)
+                    elif kind == "done":
+                        response = payload
+            except BaseException:
+                for task in started.values():
+                    task.cancel()
+                raise
+
+            if response is None:
+                raise RuntimeError("LLM stream ended without a final response")
             last_response = response
 
             # Track tokens
@@ -158,14 +241,12 @@ class Agent:
                 final_response = response.content
                 break
 
-            # Execute tool calls
-            tool_results = []
-            for tool_call in response.tool_calls:
-                result = await self._execute_tool(tool_call)
-                tool_results.append(result)
+            # Execute tool calls (reusing the ones already started)
+            tool_results = await self._execute_tools(tool_calls, started)
 
-                # Add tool result to conversation
-                self.messages.append(
+            # Add tool results to conversation (in the order they were requested)
+            for tool_call, result in zip(tool_calls, tool_results):
+                self._tail.append(
                     Message(role=MessageRole.TOOL, content=result, tool_call_id=tool_call.id)
                 )
 
@@ -188,9 +269,72 @@ class Agent:
 
         return final_response
 
+    def _is_read_only(self, tool_call: ToolCall) -> bool:
+        """Check if a tool call is read-only (can run alongside other read-only calls)"""
+        tool = self.registry.get_tool(tool_call.name)
+        return tool is not None and tool.metadata.read_only
+
+    async def _execute_limited(self, tool_call: ToolCall) -> str:
+        """Execute a read-only tool call under the concurrency limit"""
+        async with self._tool_semaphore:
+            return await self._execute_tool(tool_call)
+
+    async def _execute_tools(
+        self,
+        tool_calls: List[ToolCall],
+        started: Optional[Dict[int, asyncio.Task]] = None,
+    ) -> List[str]:
+        """
+        Execute a batch of tool calls
+
+        Calls run in the order they were requested. Each stretch of
+        consecutive read-only calls runs concurrently; every other call
+        runs on its own once everything before it has finished.
+
+        Args:
+            tool_calls: Tool calls in the order the LLM requested them
+            started: Tasks already running for some of them, by index
+
+        Returns:
+            Results in the same order as tool_calls
+        """
+        results: List[str] = []
+        tasks = dict(started or {})
+
+        try:
+            i = 0
+            while i < len(tool_calls):
+                if i not in tasks and not self._is_read_only(tool_calls[i]):
+                    results.append(await self._execute_tool(tool_calls[i]))
+                    i += 1
+                    continue
+
+                # Run the read-only stretch starting here together
+                j = i
+                while j < len(tool_calls) and (
+                    j in tasks or self._is_read_only(tool_calls[j])
+                ):
+                    if j not in tasks:
+                        tasks[j] = asyncio.create_task(self._execute_limited(tool_calls[j]))
+                    j += 1
+                results.extend(await asyncio.gather(*(tasks[k] for k in range(i, j))))
+                i = j
+        except BaseException:
+            for task in tasks.values():
+                task.cancel()
+            raise
+        finally:
+            # Record the whole batch in history at once
+            if self._pending_tool_records:
+                self._queue_history(*self._pending_tool_records)
+                self._pending_tool_records = []
+
+        return results
+
     async def _execute_tool(self, tool_call: ToolCall) -> str:
         """Execute a tool call"""
-        start_time = datetime.now()
+        start_time = datetime.now()  # wall clock for the history record
+        start_ns = time.perf_counter_ns()  # monotonic clock for the duration
 
         try:
             console.print(f"  [dim]→ Executing {tool_call.name}...[/dim]")
@@ -199,10 +343,10 @@ class Agent:
             result = await self.registry.execute_tool(tool_call.name, tool_call.arguments)
 
             # Calculate duration
-            duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+            duration_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
 
             # Track in history
-            if self.settings.history_enabled:
+            if self._history_enabled:
                 tool_record = ToolCallRecord(
                     tool=tool_call.name,
                     arguments=tool_call.arguments,
@@ -211,51 +355,11 @@ class Agent:
                     timestamp=start_time,
                     duration_ms=duration_ms,
                 )
-                self.history.add_tool_call(tool_record)
-
-            # Track achievements
-            if self.settings.achievements_enabled:
-                self.achievements.mark_tool_used(tool_call.name)
-
-                # Check for git-specific achievements
-                if tool_call.name == "git_commit":
-                    self.achievements.increment_stat("git_commits")
-                elif tool_call.name.startswith("git_"):
-                    self.achievements.increment_stat("git_tools_used")
+                self._pending_tool_records.append(tool_record)
 
-                # Check for file operations
-                if tool_call.name == "edit_file":
-                    self.achievements.increment_stat("files_edited")
-
-                # Check for newly earned achievements
-                new_achievements = self.achievements.check_and_award()
-                if new_achievements:
-                    for achievement in new_achievements:
-                        console.print(
-                            f"\n  [bold yellow]🏆 Achievement Unlocked: {achievement.name}[/bold yellow]"
-                        )
-                        console.print(f"  [dim]{achievement.description}[/dim]")
-
-            # Memory indexing für wichtige Changes
-            if self.settings.memory_enabled:
-                try:
-                    memory = get_memory_system()
-
-                    # File edits indexieren
-                    if tool_call.name == "edit_file" and result and "Error" not in result:
-                        file_path = tool_call.arguments.get("path", "unknown")
-                        await memory.index_text(
-                            f"File modified: {file_path}\nChange: {result[:300]}..."
-                        )
-
-                    # Git commits indexieren
-                    elif tool_call.name == "git_commit" and result:
-                        await memory.index_text(
-                            f"Git commit: {tool_call.arguments.get('message', 'no message')}\n{result[:200]}"
-                        )
-                except Exception:
-                    # Silently fail - memory is optional
-                    pass
+            # Feature-specific follow-up (achievements, memory)
+            for hook in self._tool_hooks:
+                hook(tool_call, result)
 
             console.print(f"  [dim green]✓ {tool_call.name} completed[/dim green]")
             return result
@@ -265,8 +369,8 @@ class Agent:
             console.print(f"  [dim red]✗ {error_msg}[/dim red]")
 
             # Track failed tool call
-            if self.settings.history_enabled:
-                duration_ms = int((datetime.now() - start_time).total_seconds() * 1000)
+            if self._history_enabled:
+                duration_ms = (time.perf_counter_ns() - start_ns) // 1_000_000
                 tool_record = ToolCallRecord(
                     tool=tool_call.name,
                     arguments=tool_call.arguments,
@@ -275,43 +379,180 @@ class Agent:
                     timestamp=start_time,
                     duration_ms=duration_ms,
                 )
-                self.history.add_tool_call(tool_record)
+                self._pending_tool_records.append(tool_record)
 
             return error_msg
 
-    def _get_tools_for_llm(self) -> List[ToolDefinition]:
-        """Get tools in LLM-compatible format"""
+    def _track_tool_achievements(self, tool_call: ToolCall, result: str) -> None:
+        """Update achievement stats for a successful tool call"""
+        self.achievements.mark_tool_used(tool_call.name)
+
+        # Tool-specific stats (git, file operations)
+        stats = _TOOL_STATS.get(tool_call.name)
+        if stats is None:
+            stats = _GIT_TOOL_STATS if tool_call.name.startswith(_GIT_PREFIXES) else ()
+        for stat in stats:
+            self.achievements.increment_stat(stat)
+
+        # Announce newly earned achievements (progress is saved at session end)
+        if self.achievements.has_pending():
+            for achievement in self.achievements.check_and_award():
+                console.print(
+                    f"\n  [bold yellow]🏆 Achievement Unlocked: {achievement.name}[/bold yellow]"
+                )
+                console.print(f"  [dim]{achievement.description}[/dim]")
+
+    def _index_tool_result(self, tool_call: ToolCall, result: str) -> None:
+        """Queue notable changes (file edits, commits) for indexing in memory"""
+        # File edits indexieren
+        if tool_call.name == "edit_file" and result and "Error" not in result:
+            file_path = tool_call.arguments.get("path", "unknown")
+            self._queue_memory(f"File modified: {file_path}\nChange: {result[:300]}...")
+
+        # Git commits indexieren
+        elif tool_call.name == "git_commit" and result:
+            self._queue_memory(
+                f"Git commit: {tool_call.arguments.get('message', 'no message')}\n{result[:200]}"
+            )
+
+    def _queue_memory(self, text: str) -> None:
+        """Queue text for the background memory writer (started on first use)"""
+        if self._memory_queue is None:
+            self._memory_queue = asyncio.Queue()
+        self._memory_queue.put_nowait(text)
+
+        if self._memory_writer is None or self._memory_writer.done():
+            self._memory_writer = asyncio.get_running_loop().create_task(self._write_memory())
+
+    async def _write_memory(self) -> None:
+        """Index queued texts, everything that piled up in one batch"""
+        queue = self._memory_queue
+        while True:
+            items = [await queue.get()]
+            while not queue.empty():
+                items.append(queue.get_nowait())
+
+            try:
+                await self._memory.index_batch(items)
+            except Exception:
+                # Silently fail - memory is optional
+                pass
+            finally:
+                for _ in items:
+                    queue.task_done()
+
+    def _queue_history(self, *records: "HistoryRecord") -> None:
+        """Queue records for the background history writer (started on first use)"""
+        if self._history_queue is None:
+            self._history_queue = asyncio.Queue()
+        for record in records:
+            self._history_queue.put_nowait(record)
+
+        if self._history_writer is None or self._history_writer.done():
+            self._history_writer = asyncio.get_running_loop().create_task(self._write_history())
+
+    async def _write_history(self) -> None:
+        """Store queued records, everything that piled up in one batch"""
+        queue = self._history_queue
+        while True:
+            records = [await queue.get()]
+            while not queue.empty():
+                records.append(queue.get_nowait())
+
+            try:
+                await asyncio.to_thread(self.history.add_batch, records)
+            except Exception:
+                # The session keeps whatever was stored; history is best effort
+                pass
+            finally:
+                for _ in records:
+                    queue.task_done()
+
+    def _drain_history(self) -> None:
+        """Store records still queued, without the writer (end_session is synchronous)"""
+        if self._history_queue is None or self._history_queue.empty():
+            return
+        records = []
+        while not self._history_queue.empty():
+            records.append(self._history_queue.get_nowait())
+            self._history_queue.task_done()
+        self.history.add_batch(records)
+
+    async def shutdown(self) -> None:
+        """
+        Flush pending history and memory writes, close the LLM connection
+        and stop the run_python fork server (call before end_session, on
+        the agent's event loop)
+
+        Also queues a summary of the session for memory.
+        """
+        try:
+            if self._history_writer is not None:
+                await self._history_queue.join()
+                self._history_writer.cancel()
+                try:
+                    await self._history_writer
+                except asyncio.CancelledError:
+                    pass
+                self._history_writer = None
+
+            if self._memory_enabled and len(self._tail) > 2:
+                self._queue_memory(self._session_summary())
+
+            if self._memory_writer is not None:
+                await self._memory_queue.join()
+                self._memory_writer.cancel()
+                try:
+                    await self._memory_writer
+                except asyncio.CancelledError:
+                    pass
+                self._memory_writer = None
+
+            if self._memory is not None:
+                await self._memory.shutdown()
+        finally:
+            await aclose_fork_server()
+            await self.llm.aclose()
+
+    def _get_tools_for_llm(self) -> Tuple[ToolDefinition, ...]:
+        """Get tools in LLM-compatible format (rebuilt only when the registry changes)"""
+        if self._tools_cache is not None and self._tools_cache[1] == self.registry.version:
+            return self._tools_cache[0]
+
         tools_data = self.registry.get_tools_for_llm()
-        return [
+        tools = tuple(
             ToolDefinition(
                 name=tool["name"],
                 description=tool["description"],
                 parameters=tool["parameters"],
             )
             for tool in tools_data
-        ]
+        )
+        self._tools_cache = (tools, self.registry.version)
+        return tools
 
     def _trim_conversation(self) -> None:
         """Trim conversation to max length, keeping system prompt"""
-        if len(self.messages) <= self.max_conversation_length:
-            return
-
-        # Keep system prompt (first message) and most recent messages
-        system_prompt = self.messages[0]
-        recent_messages = self.messages[-(self.max_conversation_length - 1) :]
-        self.messages = [system_prompt] + recent_messages
+        keep = max(self.max_conversation_length - 1, 1)
+        while len(self._tail) > keep:
+            self._tail.popleft()
 
     def start_session(self) -> None:
         """Start a new session"""
-        if self.settings.history_enabled:
+        if self._history_enabled:
             self.history.start_session()
 
+        # Pick up progress saved by other sessions since the tracker was loaded
+        if self._achievements_enabled:
+            self.achievements.reload_if_changed()
+
     def end_session(self, success: bool = True) -> None:
         """End the current session"""
-        if self.settings.history_enabled:
+        if self._history_enabled:
+            self._drain_history()
             session = self.history.end_session(success)
 
-            if session and self.settings.achievements_enabled:
+            if session and self._achievements_enabled:
                 duration_minutes = session.duration_minutes()
                 self.achievements.mark_session_completed(success, duration_minutes)
 
@@ -333,39 +574,17 @@ class Agent:
                 avg_tokens = self.total_tokens / self.total_responses
                 console.print(f"  • Avg tokens/response: {avg_tokens:.1f}")
 
-            # Session ins Memory schreiben
-            if self.settings.memory_enabled and len(self.messages) > 3:
-                try:
-                    # Start new event loop since end_session is called after the main loop ends
-                    try:
-                        loop = asyncio.get_event_loop()
-                        if loop.is_running():
-                            loop.create_task(self._index_session_summary())
-                        else:
-                            asyncio.run(self._index_session_summary())
-                    except RuntimeError:
-                        # No event loop running, create a new one
-                        asyncio.run(self._index_session_summary())
-                except Exception:
-                    # Silently fail - memory indexing is optional
-                    pass
-
-    async def _index_session_summary(self) -> None:
-        """Index important parts of the session"""
-        memory = get_memory_system()
-
+    def _session_summary(self) -> str:
+        """Summarize important parts of the session for memory"""
         # Letzte paar Messages als Context
         recent = self.messages[-5:]
         summary = "\n".join([f"{m.role.value}: {m.content[:200]}" for m in recent])
 
-        await memory.index_text(f"Session summary:\n{summary}")
+        return f"Session summary:\n{summary}"
 
     def reset_conversation(self) -> None:
         """Reset conversation (keep system prompt)"""
-        system_prompt = self.messages[0] if self.messages else None
-        self.messages = []
-        if system_prompt:
-            self.messages.append(system_prompt)
-        else:
+        self._tail.clear()
+        if self._system is None:
             self._initialize_system_prompt()
 
@@ -4,13 +4,15 @@ Approval System for Dangerous Operations
 Manages user approval for destructive and dangerous operations
 """
 
-from typing import Callable, Optional
+import io
+import re
+from typing import Callable, Optional, Union
 from dataclasses import dataclass
-from rich.console import Console
+from ..cli.console import get_console
 from rich.panel import Panel
 from rich.prompt import Confirm
 
-console = Console()
+console = get_console()
 
 
 @dataclass
@@ -19,20 +21,25 @@ class ApprovalRequest:
 
     operation: str
     reason: str
-    details: str
+    details: Union[str, Callable[[], str]]  # callable is only evaluated for display
     dangerous: bool = False
 
 
 # Dangerous operations that always require approval
-DANGEROUS_OPERATIONS = [
-    "write_file",
-    "edit_file",
-    "delete_file",
-    "git_commit",
-    "git_push",
-    "execute_command",
-    "run_script",
-]
+DANGEROUS_OPERATIONS = frozenset(
+    {
+        "write_file",
+        "edit_file",
+        "delete_file",
+        "git_commit",
+        "git_push",
+        "execute_command",
+        "run_script",
+    }
+)
+
+# Operations that modify the git repository
+_GIT_OPS = frozenset({"git_push", "git_commit"})
 
 # File patterns that are always dangerous to modify
 DANGEROUS_PATHS = [
@@ -51,6 +58,9 @@ DANGEROUS_PATHS = [
     "requirements.txt",
 ]
 
+# All dangerous path fragments in one case-insensitive pattern (single scan per path)
+_DANGER_RE = re.compile("|".join(re.escape(p) for p in DANGEROUS_PATHS), re.IGNORECASE)
+
 
 class ApprovalSystem:
     """Manages approval for dangerous operations"""
@@ -78,27 +88,19 @@ class ApprovalSystem:
 
     def is_dangerous_path(self, path: str) -> bool:
         """Check if a path is dangerous to modify"""
-        path_lower = path.lower()
-        return any(dangerous in path_lower for dangerous in DANGEROUS_PATHS)
+        return _DANGER_RE.search(path) is not None
+
+    def _classify(self, operation: str, kwargs: dict) -> tuple[bool, bool]:
+        """Classify an operation once: (dangerous operation, dangerous path)"""
+        dangerous_path = "path" in kwargs and self.is_dangerous_path(kwargs["path"])
+        return self.is_dangerous_operation(operation), dangerous_path
 
     def needs_approval(self, operation: str, **kwargs: any) -> bool:
         """Check if an operation needs approval"""
-        if not self.require_approval:
-            return False
-
-        if self._auto_approve_all:
+        if not self.require_approval or self._auto_approve_all:
             return False
 
-        # Check if operation is dangerous
-        if self.is_dangerous_operation(operation):
-            return True
-
-        # Check for dangerous paths
-        if "path" in kwargs:
-            if self.is_dangerous_path(kwargs["path"]):
-                return True
-
-        return False
+        return any(self._classify(operation, kwargs))
 
     def request_approval(self, request: ApprovalRequest) -> bool:
         """
@@ -124,11 +126,13 @@ class ApprovalSystem:
         """CLI-based approval prompt"""
         console.print()
 
+        details = request.details() if callable(request.details) else request.details
+
         # Build warning panel
         warning_text = f"[bold yellow]⚠ APPROVAL REQUIRED[/bold yellow]\n\n"
         warning_text += f"[bold]Operation:[/bold] {request.operation}\n"
         warning_text += f"[bold]Reason:[/bold] {request.reason}\n\n"
-        warning_text += f"[dim]{request.details}[/dim]"
+        warning_text += f"[dim]{details}[/dim]"
 
         if request.dangerous:
             warning_text += "\n\n[bold red]⚠ This is a DANGEROUS operation![/bold red]"
@@ -167,15 +171,18 @@ class ApprovalSystem:
         Raises:
             ApprovalDeniedError: If approval is denied
         """
-        if self.needs_approval(operation, **kwargs):
-            # Build approval request
-            details = "\n".join([f"{k}: {v}" for k, v in kwargs.items()])
+        if self.require_approval and not self._auto_approve_all:
+            dangerous_op, dangerous_path = self._classify(operation, kwargs)
+        else:
+            dangerous_op = dangerous_path = False
 
+        if dangerous_op or dangerous_path:
+            # Build approval request (details are only formatted if shown)
             request = ApprovalRequest(
                 operation=operation,
-                reason=self._get_approval_reason(operation, **kwargs),
-                details=details,
-                dangerous=self.is_dangerous_operation(operation),
+                reason=self._format_reason(operation, dangerous_op, dangerous_path),
+                details=lambda: _format_details(kwargs),
+                dangerous=dangerous_op,
             )
 
             # Request approval
@@ -187,15 +194,19 @@ class ApprovalSystem:
 
     def _get_approval_reason(self, operation: str, **kwargs: any) -> str:
         """Get reason why approval is needed"""
+        return self._format_reason(operation, *self._classify(operation, kwargs))
+
+    def _format_reason(self, operation: str, dangerous_op: bool, dangerous_path: bool) -> str:
+        """Build the approval reason from an already classified operation"""
         reasons = []
 
-        if self.is_dangerous_operation(operation):
+        if dangerous_op:
             reasons.append("Dangerous operation")
 
-        if "path" in kwargs and self.is_dangerous_path(kwargs["path"]):
+        if dangerous_path:
             reasons.append("Modifying sensitive file/directory")
 
-        if operation in ["git_push", "git_commit"]:
+        if operation in _GIT_OPS:
             reasons.append("Modifying git repository")
 
         if not reasons:
@@ -204,6 +215,16 @@ class ApprovalSystem:
         return ", ".join(reasons)
 
 
+def _format_details(kwargs: dict) -> str:
+    """Format operation arguments as one "key: value" line each"""
+    buffer = io.StringIO()
+    for i, (key, value) in enumerate(kwargs.items()):
+        if i:
+            buffer.write("\n")
+        buffer.write(f"{key}: {value}")
+    return buffer.getvalue()
+
+
 class ApprovalDeniedError(Exception):
     """Raised when user denies approval"""
 
@@ -1,8 +1,19 @@
 """LLM Provider implementations"""
 
+import importlib
+from typing import TYPE_CHECKING, Any
+
 from .base import LLMProvider, Message, MessageRole, ToolDefinition, LLMResponse
-from .ollama import OllamaProvider
-from .textgen import TextGenProvider
+
+if TYPE_CHECKING:
+    from .ollama import OllamaProvider
+    from .textgen import TextGenProvider
+
+# Providers are imported on first access so only the selected one is loaded
+_LAZY_ATTRS = {
+    "OllamaProvider": ".ollama",
+    "TextGenProvider": ".textgen",
+}
 
 __all__ = [
     "LLMProvider",
@@ -14,3 +25,13 @@ __all__ = [
     "TextGenProvider",
 ]
 
+
+def __getattr__(name: str) -> Any:
+    """Import lazily exported providers on first access"""
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
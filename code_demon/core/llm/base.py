@@ -4,10 +4,12 @@ LLM Provider Base Classes
 Abstract interfaces for LLM providers
 """
 
+import ipaddress
 from abc import ABC, abstractmethod
-from typing import Any, AsyncGenerator, List, Dict, Optional
-from dataclasses import dataclass
+from typing import Any, AsyncGenerator, List, Dict, Optional, Sequence, Tuple
+from dataclasses import dataclass, field
 from enum import Enum
+from urllib.parse import urlsplit
 
 
 class MessageRole(str, Enum):
@@ -19,7 +21,7 @@ class MessageRole(str, Enum):
     TOOL = "tool"
 
 
-@dataclass
+@dataclass(slots=True)
 class Message:
     """A message in the conversation"""
 
@@ -29,7 +31,7 @@ class Message:
     tool_call_id: Optional[str] = None
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolDefinition:
     """Definition of a tool that the LLM can call"""
 
@@ -37,8 +39,18 @@ class ToolDefinition:
     description: str
     parameters: Dict[str, Any]  # JSON Schema
 
+    # JSON-ready function description, built once and reused for every request
+    wire: Dict[str, Any] = field(init=False, repr=False, compare=False)
 
-@dataclass
+    def __post_init__(self) -> None:
+        self.wire = {
+            "name": self.name,
+            "description": self.description,
+            "parameters": self.parameters,
+        }
+
+
+@dataclass(slots=True)
 class ToolCall:
     """A tool call made by the LLM"""
 
@@ -47,18 +59,23 @@ class ToolCall:
     arguments: Dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True)
 class LLMResponse:
     """Response from LLM"""
 
     content: str
-    tool_calls: List[ToolCall]
+    tool_calls: Sequence[ToolCall]
     finish_reason: str
     model: str
     tokens_used: Optional[int] = None
     tokens_per_second: Optional[float] = None
 
 
+# Event from stream_chat_structured: ("delta", str), ("tool_call", ToolCall)
+# or, always last, ("done", LLMResponse)
+StreamEvent = Tuple[str, Any]
+
+
 class LLMProvider(ABC):
     """Abstract base class for LLM providers"""
 
@@ -66,11 +83,21 @@ class LLMProvider(ABC):
         self.model = model
         self.base_url = base_url
 
+    def _is_local(self) -> bool:
+        """Check if the provider is reached over a loopback address"""
+        host = urlsplit(self.base_url).hostname or ""
+        if host == "localhost":
+            return True
+        try:
+            return ipaddress.ip_address(host).is_loopback
+        except ValueError:
+            return False
+
     @abstractmethod
     async def chat(
         self,
         messages: List[Message],
-        tools: Optional[List[ToolDefinition]] = None,
+        tools: Optional[Sequence[ToolDefinition]] = None,
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
     ) -> LLMResponse:
@@ -92,7 +119,7 @@ class LLMProvider(ABC):
     async def stream_chat(
         self,
         messages: List[Message],
-        tools: Optional[List[ToolDefinition]] = None,
+        tools: Optional[Sequence[ToolDefinition]] = None,
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
     ) -> AsyncGenerator[str, None]:
@@ -110,6 +137,38 @@ class LLMProvider(ABC):
         """
         pass
 
+    async def stream_chat_structured(
+        self,
+        messages: List[Message],
+        tools: Optional[Sequence[ToolDefinition]] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncGenerator[StreamEvent, None]:
+        """
+        Stream a chat response as structured events
+
+        Tool calls are yielded as soon as they are complete, so callers can
+        start executing them while the rest of the response is generated.
+        The default implementation wraps chat(); providers that can stream
+        tool calls override it.
+
+        Args:
+            messages: Conversation history
+            tools: Available tools for the LLM to call
+            temperature: Sampling temperature (0.0 - 1.0)
+            max_tokens: Maximum tokens to generate
+
+        Yields:
+            ("delta", str) content chunks, ("tool_call", ToolCall) per tool
+            call, then ("done", LLMResponse) with the complete response
+        """
+        response = await self.chat(messages, tools, temperature, max_tokens)
+        if response.content:
+            yield ("delta", response.content)
+        for tool_call in response.tool_calls:
+            yield ("tool_call", tool_call)
+        yield ("done", response)
+
     @abstractmethod
     def supports_tools(self) -> bool:
         """
@@ -130,6 +189,10 @@ class LLMProvider(ABC):
         """
         pass
 
+    async def aclose(self) -> None:
+        """Release network resources held by the provider (no-op by default)"""
+        pass
+
 
 class LLMError(Exception):
     """Base exception for LLM errors"""
@@ -4,9 +4,9 @@ Ollama LLM Provider
 Integration with Ollama API for local LLM inference
 """
 
-import json
+import asyncio
 import aiohttp
-from typing import List, Optional, AsyncGenerator, Dict, Any
+from typing import List, Optional, AsyncGenerator, Dict, Any, Sequence, Tuple
 from .base import (
     LLMProvider,
     Message,
@@ -16,7 +16,20 @@ from .base import (
     LLMConnectionError,
     LLMTimeoutError,
     MessageRole,
+    StreamEvent,
 )
+from .streaming import iter_ndjson
+from ...utils import json_compat
+
+# Request bodies are serialized up front and sent as raw bytes
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Request options for the default sampling settings (shared, never modified)
+_DEFAULT_TEMPERATURE = 0.7
+_DEFAULT_OPTIONS: Dict[str, Any] = {"temperature": _DEFAULT_TEMPERATURE}
+
+# Shared result for the common case of a response without tool calls
+_NO_TOOL_CALLS: Tuple[ToolCall, ...] = ()
 
 
 class OllamaProvider(LLMProvider):
@@ -25,47 +38,114 @@ class OllamaProvider(LLMProvider):
     def __init__(self, model: str, base_url: str = "http://localhost:11434"):
         super().__init__(model, base_url)
         self.timeout = aiohttp.ClientTimeout(total=300)  # 5 minutes
+        self._session: Optional[aiohttp.ClientSession] = None
+
+        # JSON-encoded messages by id() of the Message they came from, kept
+        # for the messages of the last request (entries hold the Message so
+        # the id cannot be reused while cached)
+        self._message_cache: Dict[int, Tuple[Message, bytes]] = {}
+        # JSON-encoded tools for the last tools sequence passed in
+        self._tools_cache: Optional[Tuple[Sequence[ToolDefinition], bytes]] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session (created on first use, kept alive between requests)"""
+        if self._session is None or self._session.closed:
+            # Compression only costs CPU on loopback, so ask for plain bodies
+            headers = {"Accept-Encoding": "identity"} if self._is_local() else None
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                headers=headers,
+                connector=aiohttp.TCPConnector(
+                    limit=32, keepalive_timeout=75, ttl_dns_cache=300
+                ),
+            )
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
 
-    def _convert_messages(self, messages: List[Message]) -> List[Dict[str, Any]]:
-        """Convert Message objects to Ollama format"""
-        ollama_messages = []
+    def _convert_message(self, msg: Message) -> Dict[str, Any]:
+        """Convert a Message object to Ollama format"""
+        ollama_msg: Dict[str, Any] = {
+            "role": msg.role.value,
+            "content": msg.content,
+        }
+        if msg.tool_calls:
+            ollama_msg["tool_calls"] = msg.tool_calls
+        return ollama_msg
+
+    def _encode_messages(self, messages: List[Message]) -> bytes:
+        """Encode messages as a JSON array (only new messages are serialized)"""
+        cache: Dict[int, Tuple[Message, bytes]] = {}
+        encoded = []
         for msg in messages:
-            ollama_msg: Dict[str, Any] = {
-                "role": msg.role.value,
-                "content": msg.content,
-            }
-            if msg.tool_calls:
-                ollama_msg["tool_calls"] = msg.tool_calls
-            ollama_messages.append(ollama_msg)
-        return ollama_messages
-
-    def _convert_tools(self, tools: List[ToolDefinition]) -> List[Dict[str, Any]]:
-        """Convert ToolDefinition objects to Ollama format"""
-        ollama_tools = []
-        for tool in tools:
-            ollama_tools.append(
-                {
-                    "type": "function",
-                    "function": {
-                        "name": tool.name,
-                        "description": tool.description,
-                        "parameters": tool.parameters,
-                    },
-                }
+            entry = self._message_cache.get(id(msg))
+            if entry is None or entry[0] is not msg:
+                entry = (msg, json_compat.dumps(self._convert_message(msg)))
+            cache[id(msg)] = entry
+            encoded.append(entry[1])
+
+        self._message_cache = cache
+        return b"[" + b",".join(encoded) + b"]"
+
+    def _encode_tools(self, tools: Sequence[ToolDefinition]) -> bytes:
+        """Encode tools in Ollama format as a JSON array (cached for the same sequence)"""
+        if self._tools_cache is None or self._tools_cache[0] is not tools:
+            self._tools_cache = (
+                tools,
+                json_compat.dumps(
+                    [{"type": "function", "function": tool.wire} for tool in tools]
+                ),
             )
-        return ollama_tools
+        return self._tools_cache[1]
 
-    def _parse_tool_calls(self, response_data: Dict[str, Any]) -> List[ToolCall]:
-        """Parse tool calls from Ollama response"""
-        tool_calls = []
-        message = response_data.get("message", {})
-        raw_tool_calls = message.get("tool_calls", [])
+    def _build_body(
+        self,
+        messages: List[Message],
+        tools: Optional[Sequence[ToolDefinition]],
+        temperature: float,
+        max_tokens: Optional[int],
+        stream: bool,
+    ) -> bytes:
+        """
+        Build the /api/chat request body
+
+        Messages and tools are spliced in as already-encoded JSON, so only
+        the small request header is serialized per call.
+        """
+        if temperature == _DEFAULT_TEMPERATURE and not max_tokens:
+            # Common case: share one options dict instead of building a new one
+            options = _DEFAULT_OPTIONS
+        else:
+            options = {"temperature": temperature}
+            if max_tokens:
+                options["num_predict"] = max_tokens
 
-        for idx, tc in enumerate(raw_tool_calls):
+        head = json_compat.dumps({"model": self.model, "stream": stream, "options": options})
+
+        parts = [head[:-1], b',"messages":', self._encode_messages(messages)]
+        if tools:
+            parts += [b',"tools":', self._encode_tools(tools)]
+        parts.append(b"}")
+        return b"".join(parts)
+
+    def _parse_tool_calls(
+        self, response_data: Dict[str, Any], start_index: int = 0
+    ) -> Sequence[ToolCall]:
+        """Parse tool calls from Ollama response (start_index numbers calls without an id)"""
+        raw_tool_calls = response_data.get("message", {}).get("tool_calls")
+        if not raw_tool_calls:
+            return _NO_TOOL_CALLS
+
+        tool_calls = []
+        for idx, tc in enumerate(raw_tool_calls, start_index):
             func = tc.get("function", {})
             tool_calls.append(
                 ToolCall(
-                    id=tc.get("id", f"call_{idx}"),
+                    id=tc.get("id") or f"call_{idx}",
                     name=func.get("name", ""),
                     arguments=func.get("arguments", {}),
                 )
@@ -75,116 +155,149 @@ class OllamaProvider(LLMProvider):
     async def chat(
         self,
         messages: List[Message],
-        tools: Optional[List[ToolDefinition]] = None,
+        tools: Optional[Sequence[ToolDefinition]] = None,
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
     ) -> LLMResponse:
         """Send chat request to Ollama"""
         url = f"{self.base_url}/api/chat"
 
-        payload: Dict[str, Any] = {
-            "model": self.model,
-            "messages": self._convert_messages(messages),
-            "stream": False,
-            "options": {
-                "temperature": temperature,
-            },
-        }
+        body = self._build_body(messages, tools, temperature, max_tokens, stream=False)
 
-        if max_tokens:
-            payload["options"]["num_predict"] = max_tokens
+        try:
+            session = await self._get_session()
+            async with session.post(url, data=body, headers=_JSON_HEADERS) as response:
+                if response.status != 200:
+                    text = await response.text()
+                    raise LLMConnectionError(
+                        f"Ollama API error: {response.status} - {text}"
+                    )
 
-        if tools:
-            payload["tools"] = self._convert_tools(tools)
+                data = json_compat.loads(await response.read())
 
-        try:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.post(url, json=payload) as response:
-                    if response.status != 200:
-                        text = await response.text()
-                        raise LLMConnectionError(
-                            f"Ollama API error: {response.status} - {text}"
-                        )
+                # Extract response content
+                message = data.get("message", {})
+                content = message.get("content", "")
 
-                    data = await response.json()
-
-                    # Extract response content
-                    message = data.get("message", {})
-                    content = message.get("content", "")
-
-                    # Parse tool calls if present
-                    tool_calls = self._parse_tool_calls(data)
-
-                    # Calculate performance metrics
-                    eval_count = data.get("eval_count", 0)
-                    eval_duration = data.get("eval_duration", 0)
-                    tokens_per_sec = None
-                    if eval_count and eval_duration:
-                        # eval_duration is in nanoseconds
-                        tokens_per_sec = eval_count / (eval_duration / 1e9)
-
-                    return LLMResponse(
-                        content=content,
-                        tool_calls=tool_calls,
-                        finish_reason=data.get("done_reason", "stop"),
-                        model=self.model,
-                        tokens_used=eval_count,
-                        tokens_per_second=tokens_per_sec,
-                    )
+                # Parse tool calls if present
+                tool_calls = self._parse_tool_calls(data)
+
+                # Calculate performance metrics
+                eval_count = data.get("eval_count", 0)
+                eval_duration = data.get("eval_duration", 0)
+                tokens_per_sec = None
+                if eval_count and eval_duration:
+                    # eval_duration is in nanoseconds
+                    tokens_per_sec = eval_count / (eval_duration / 1e9)
+
+                return LLMResponse(
+                    content=content,
+                    tool_calls=tool_calls,
+                    finish_reason=data.get("done_reason", "stop"),
+                    model=self.model,
+                    tokens_used=eval_count,
+                    tokens_per_second=tokens_per_sec,
+                )
 
+        except (asyncio.TimeoutError, TimeoutError) as e:
+            raise LLMTimeoutError("Ollama request timed out") from e
         except aiohttp.ClientError as e:
             raise LLMConnectionError(f"Failed to connect to Ollama: {e}")
-        except asyncio.TimeoutError:
-            raise LLMTimeoutError("Ollama request timed out")
 
     async def stream_chat(
         self,
         messages: List[Message],
-        tools: Optional[List[ToolDefinition]] = None,
+        tools: Optional[Sequence[ToolDefinition]] = None,
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
     ) -> AsyncGenerator[str, None]:
         """Stream chat response from Ollama"""
         url = f"{self.base_url}/api/chat"
 
-        payload: Dict[str, Any] = {
-            "model": self.model,
-            "messages": self._convert_messages(messages),
-            "stream": True,
-            "options": {
-                "temperature": temperature,
-            },
-        }
+        body = self._build_body(messages, tools, temperature, max_tokens, stream=True)
 
-        if max_tokens:
-            payload["options"]["num_predict"] = max_tokens
+        try:
+            session = await self._get_session()
+            async with session.post(url, data=body, headers=_JSON_HEADERS) as response:
+                if response.status != 200:
+                    text = await response.text()
+                    raise LLMConnectionError(
+                        f"Ollama API error: {response.status} - {text}"
+                    )
 
-        if tools:
-            payload["tools"] = self._convert_tools(tools)
+                async for data in iter_ndjson(response.content):
+                    content = data.get("message", {}).get("content", "")
+                    if content:
+                        yield content
+
+        except (asyncio.TimeoutError, TimeoutError) as e:
+            raise LLMTimeoutError("Ollama request timed out") from e
+        except aiohttp.ClientError as e:
+            raise LLMConnectionError(f"Failed to connect to Ollama: {e}")
+
+    async def stream_chat_structured(
+        self,
+        messages: List[Message],
+        tools: Optional[Sequence[ToolDefinition]] = None,
+        temperature: float = 0.7,
+        max_tokens: Optional[int] = None,
+    ) -> AsyncGenerator[StreamEvent, None]:
+        """Stream chat response from Ollama as content, tool call and done events"""
+        url = f"{self.base_url}/api/chat"
+
+        body = self._build_body(messages, tools, temperature, max_tokens, stream=True)
+
+        content_parts: List[str] = []
+        tool_calls: List[ToolCall] = []
 
         try:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.post(url, json=payload) as response:
-                    if response.status != 200:
-                        text = await response.text()
-                        raise LLMConnectionError(
-                            f"Ollama API error: {response.status} - {text}"
-                        )
+            session = await self._get_session()
+            async with session.post(url, data=body, headers=_JSON_HEADERS) as response:
+                if response.status != 200:
+                    text = await response.text()
+                    raise LLMConnectionError(
+                        f"Ollama API error: {response.status} - {text}"
+                    )
+
+                async for data in iter_ndjson(response.content):
+                    content = data.get("message", {}).get("content", "")
+                    if content:
+                        content_parts.append(content)
+                        yield ("delta", content)
+
+                    # Ollama sends each tool call complete within a single chunk
+                    for tool_call in self._parse_tool_calls(data, len(tool_calls)):
+                        tool_calls.append(tool_call)
+                        yield ("tool_call", tool_call)
 
-                    async for line in response.content:
-                        if line:
-                            try:
-                                data = json.loads(line)
-                                message = data.get("message", {})
-                                content = message.get("content", "")
-                                if content:
-                                    yield content
-                            except json.JSONDecodeError:
-                                continue
+                    if data.get("done"):
+                        eval_count = data.get("eval_count", 0)
+                        eval_duration = data.get("eval_duration", 0)
+                        tokens_per_sec = None
+                        if eval_count and eval_duration:
+                            # eval_duration is in nanoseconds
+                            tokens_per_sec = eval_count / (eval_duration / 1e9)
 
+                        yield (
+                            "done",
+                            LLMResponse(
+                                content="".join(content_parts),
+                                tool_calls=tool_calls,
+                                finish_reason=data.get("done_reason", "stop"),
+                                model=self.model,
+                                tokens_used=eval_count,
+                                tokens_per_second=tokens_per_sec,
+                            ),
+                        )
+                        return
+
+        except (asyncio.TimeoutError, TimeoutError) as e:
+            raise LLMTimeoutError("Ollama request timed out") from e
         except aiohttp.ClientError as e:
             raise LLMConnectionError(f"Failed to connect to Ollama: {e}")
 
+        raise LLMConnectionError("Ollama stream ended before the response was complete")
+
     def supports_tools(self) -> bool:
         """Ollama supports tool calling"""
         return True
@@ -193,10 +306,8 @@ class OllamaProvider(LLMProvider):
         """Check if Ollama is available"""
         url = f"{self.base_url}/api/tags"
         try:
-            async with aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=5)
-            ) as session:
-                async with session.get(url) as response:
-                    return response.status == 200
+            session = await self._get_session()
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                return response.status == 200
         except Exception:
             return False
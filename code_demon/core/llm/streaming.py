@@ -0,0 +1,60 @@
+"""
+Streaming Helpers
+
+Incremental NDJSON decoding for streamed LLM responses
+"""
+
+from typing import Any, AsyncIterator
+
+import aiohttp
+
+from ...utils import json_compat
+
+# Consumed bytes are only cut from the stream buffer past this many
+_COMPACT_THRESHOLD = 4096
+
+
+def _decode(raw: bytes) -> Any:
+    """Decode one NDJSON line (None for blank or malformed lines)"""
+    if not raw.strip():
+        return None
+    try:
+        return json_compat.loads(raw)
+    except json_compat.JSONDecodeError:
+        return None
+
+
+async def iter_ndjson(content: aiohttp.StreamReader) -> AsyncIterator[Any]:
+    """
+    Yield JSON objects from a newline-delimited JSON response body
+
+    Consumes the body chunk by chunk and splits complete lines out of one
+    buffer, instead of going through the StreamReader's line reader. Parsed
+    bytes are skipped by offset and compacted away only occasionally.
+    Blank and malformed lines are skipped.
+
+    Args:
+        content: Response body stream
+
+    Yields:
+        Decoded JSON objects in the order they were received
+    """
+    buf = bytearray()
+    start = 0  # offset of the first unparsed byte in buf
+    async for chunk, _ in content.iter_chunks():
+        buf.extend(chunk)
+        while (end := buf.find(b"\n", start)) >= 0:
+            data = _decode(buf[start:end])
+            start = end + 1
+            if data is not None:
+                yield data
+
+        # Drop consumed bytes only once they make up most of a sizeable buffer
+        if start > _COMPACT_THRESHOLD and start * 2 > len(buf):
+            del buf[:start]
+            start = 0
+
+    # Last line without a trailing newline
+    data = _decode(buf[start:])
+    if data is not None:
+        yield data
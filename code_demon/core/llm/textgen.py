@@ -4,9 +4,9 @@ Text Generation WebUI Provider
 Integration with Text Generation WebUI (oobabooga) API
 """
 
-import json
+import asyncio
 import aiohttp
-from typing import List, Optional, AsyncGenerator, Dict, Any
+from typing import List, Optional, AsyncGenerator, Dict, Any, Sequence
 from .base import (
     LLMProvider,
     Message,
@@ -17,6 +17,19 @@ from .base import (
     LLMTimeoutError,
     MessageRole,
 )
+from .streaming import iter_ndjson
+from ...utils import json_compat
+
+# Request bodies are serialized up front and sent as raw bytes
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Prompt line prefix for each message role
+_ROLE_PREFIX = {
+    MessageRole.SYSTEM: "System: ",
+    MessageRole.USER: "User: ",
+    MessageRole.ASSISTANT: "Assistant: ",
+    MessageRole.TOOL: "Tool Result: ",
+}
 
 
 class TextGenProvider(LLMProvider):
@@ -25,46 +38,57 @@ class TextGenProvider(LLMProvider):
     def __init__(self, model: str = "default", base_url: str = "http://localhost:5000"):
         super().__init__(model, base_url)
         self.timeout = aiohttp.ClientTimeout(total=300)  # 5 minutes
-
-    def _convert_messages_to_prompt(self, messages: List[Message]) -> str:
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    async def _get_session(self) -> aiohttp.ClientSession:
+        """Get the shared HTTP session (created on first use, kept alive between requests)"""
+        if self._session is None or self._session.closed:
+            # Compression only costs CPU on loopback, so ask for plain bodies
+            headers = {"Accept-Encoding": "identity"} if self._is_local() else None
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                headers=headers,
+                connector=aiohttp.TCPConnector(
+                    limit=32, keepalive_timeout=75, ttl_dns_cache=300
+                ),
+            )
+        return self._session
+
+    async def aclose(self) -> None:
+        """Close the shared HTTP session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _convert_messages_to_prompt(
+        self,
+        messages: List[Message],
+        tools: Optional[Sequence[ToolDefinition]] = None,
+    ) -> str:
         """
-        Convert messages to a single prompt string
+        Convert messages (and tool descriptions) to a single prompt string
         TextGen doesn't support conversation format natively
         """
-        prompt_parts = []
-        for msg in messages:
-            if msg.role == MessageRole.SYSTEM:
-                prompt_parts.append(f"System: {msg.content}")
-            elif msg.role == MessageRole.USER:
-                prompt_parts.append(f"User: {msg.content}")
-            elif msg.role == MessageRole.ASSISTANT:
-                prompt_parts.append(f"Assistant: {msg.content}")
-            elif msg.role == MessageRole.TOOL:
-                prompt_parts.append(f"Tool Result: {msg.content}")
-
+        prompt_parts = [_ROLE_PREFIX[msg.role] + msg.content for msg in messages]
+        if tools:
+            prompt_parts.append(
+                "Available Tools:\n"
+                + "\n".join(f"- {tool.name}: {tool.description}" for tool in tools)
+            )
         prompt_parts.append("Assistant:")
         return "\n\n".join(prompt_parts)
 
     async def chat(
         self,
         messages: List[Message],
-        tools: Optional[List[ToolDefinition]] = None,
+        tools: Optional[Sequence[ToolDefinition]] = None,
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
     ) -> LLMResponse:
         """Send chat request to Text Generation WebUI"""
         url = f"{self.base_url}/api/v1/generate"
 
-        prompt = self._convert_messages_to_prompt(messages)
-
-        # Add tool descriptions to prompt if provided
-        if tools:
-            tool_descriptions = "\n\nAvailable Tools:\n"
-            for tool in tools:
-                tool_descriptions += f"- {tool.name}: {tool.description}\n"
-            # Insert before the last "Assistant:" line
-            parts = prompt.rsplit("Assistant:", 1)
-            prompt = parts[0] + tool_descriptions + "\nAssistant:" + parts[1]
+        prompt = self._convert_messages_to_prompt(messages, tools)
 
         payload: Dict[str, Any] = {
             "prompt": prompt,
@@ -74,51 +98,46 @@ class TextGenProvider(LLMProvider):
         }
 
         try:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.post(url, json=payload) as response:
-                    if response.status != 200:
-                        text = await response.text()
-                        raise LLMConnectionError(
-                            f"TextGen API error: {response.status} - {text}"
-                        )
-
-                    data = await response.json()
-                    content = data.get("results", [{}])[0].get("text", "").strip()
-
-                    # TextGen doesn't support native tool calling
-                    # We return empty tool_calls
-                    return LLMResponse(
-                        content=content,
-                        tool_calls=[],
-                        finish_reason="stop",
-                        model=self.model,
-                        tokens_used=None,
-                        tokens_per_second=None,
+            session = await self._get_session()
+            async with session.post(
+                url, data=json_compat.dumps(payload), headers=_JSON_HEADERS
+            ) as response:
+                if response.status != 200:
+                    text = await response.text()
+                    raise LLMConnectionError(
+                        f"TextGen API error: {response.status} - {text}"
                     )
 
+                data = json_compat.loads(await response.read())
+                content = data.get("results", [{}])[0].get("text", "").strip()
+
+                # TextGen doesn't support native tool calling
+                # We return empty tool_calls
+                return LLMResponse(
+                    content=content,
+                    tool_calls=(),
+                    finish_reason="stop",
+                    model=self.model,
+                    tokens_used=None,
+                    tokens_per_second=None,
+                )
+
+        except (asyncio.TimeoutError, TimeoutError) as e:
+            raise LLMTimeoutError("TextGen request timed out") from e
         except aiohttp.ClientError as e:
             raise LLMConnectionError(f"Failed to connect to TextGen: {e}")
-        except asyncio.TimeoutError:
-            raise LLMTimeoutError("TextGen request timed out")
 
     async def stream_chat(
         self,
         messages: List[Message],
-        tools: Optional[List[ToolDefinition]] = None,
+        tools: Optional[Sequence[ToolDefinition]] = None,
         temperature: float = 0.7,
         max_tokens: Optional[int] = None,
     ) -> AsyncGenerator[str, None]:
         """Stream chat response from Text Generation WebUI"""
         url = f"{self.base_url}/api/v1/stream"
 
-        prompt = self._convert_messages_to_prompt(messages)
-
-        if tools:
-            tool_descriptions = "\n\nAvailable Tools:\n"
-            for tool in tools:
-                tool_descriptions += f"- {tool.name}: {tool.description}\n"
-            parts = prompt.rsplit("Assistant:", 1)
-            prompt = parts[0] + tool_descriptions + "\nAssistant:" + parts[1]
+        prompt = self._convert_messages_to_prompt(messages, tools)
 
         payload: Dict[str, Any] = {
             "prompt": prompt,
@@ -128,24 +147,23 @@ class TextGenProvider(LLMProvider):
         }
 
         try:
-            async with aiohttp.ClientSession(timeout=self.timeout) as session:
-                async with session.post(url, json=payload) as response:
-                    if response.status != 200:
-                        text = await response.text()
-                        raise LLMConnectionError(
-                            f"TextGen API error: {response.status} - {text}"
-                        )
-
-                    async for line in response.content:
-                        if line:
-                            try:
-                                data = json.loads(line)
-                                token = data.get("token", "")
-                                if token:
-                                    yield token
-                            except json.JSONDecodeError:
-                                continue
+            session = await self._get_session()
+            async with session.post(
+                url, data=json_compat.dumps(payload), headers=_JSON_HEADERS
+            ) as response:
+                if response.status != 200:
+                    text = await response.text()
+                    raise LLMConnectionError(
+                        f"TextGen API error: {response.status} - {text}"
+                    )
+
+                async for data in iter_ndjson(response.content):
+                    token = data.get("token", "")
+                    if token:
+                        yield token
 
+        except (asyncio.TimeoutError, TimeoutError) as e:
+            raise LLMTimeoutError("TextGen request timed out") from e
         except aiohttp.ClientError as e:
             raise LLMConnectionError(f"Failed to connect to TextGen: {e}")
 
@@ -157,15 +175,8 @@ class TextGenProvider(LLMProvider):
         """Check if TextGen is available"""
         url = f"{self.base_url}/api/v1/model"
         try:
-            async with aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=5)
-            ) as session:
-                async with session.get(url) as response:
-                    return response.status == 200
+            session = await self._get_session()
+            async with session.get(url, timeout=aiohttp.ClientTimeout(total=5)) as response:
+                return response.status == 200
         except Exception:
             return False
-
-
-# For convenience
-import asyncio
-
@@ -6,12 +6,16 @@ Provides long-term memory capabilities using Cognee's graph/vector store.
 
 import os
 import asyncio
+import hashlib
 import logging
+import time
+from collections import OrderedDict
 from pathlib import Path
-from typing import List, Optional, Any
-from rich.console import Console
+from typing import Dict, Iterable, Iterator, List, Optional, Any, Sequence, Tuple
+from ..cli.console import get_console
 
 from ..config.settings import get_settings
+from ..utils import json_compat
 
 # Suppress Cognee's verbose logging
 logging.getLogger("cognee").setLevel(logging.ERROR)
@@ -32,7 +36,26 @@ except ImportError:
     cognee_search = None
     cognee_cognify = None
 
-console = Console()
+console = get_console()
+
+# File types picked up by index_project_files
+_INDEX_EXTENSIONS = frozenset({".md", ".py", ".txt", ".rst"})
+
+# Directories index_project_files never descends into
+_SKIP_DIRS = frozenset({".git", "__pycache__", "node_modules", ".venv"})
+
+# How many texts are handed to Cognee at the same time when adding one by one
+_ADD_CONCURRENCY = 8
+
+# Search results are reused for this many seconds, for up to this many queries
+_SEARCH_CACHE_TTL = 60.0
+_SEARCH_CACHE_SIZE = 256
+
+# Content hashes of files already indexed, so unchanged files are skipped on restart
+_FILE_HASHES_PATH = Path(".code_demon_memory") / "index.json"
+
+# Whether cognee.add takes a list of texts (cleared on the first TypeError)
+_LIST_ADD_SUPPORTED = True
 
 
 class MemorySystem:
@@ -45,6 +68,10 @@ class MemorySystem:
         self.settings = get_settings()
         self.enabled = self.settings.memory_enabled and COGNEE_AVAILABLE
         self._initialized = False
+        self._file_hashes: Dict[str, str] = {}
+        self._bg_index: Optional[asyncio.Task] = None
+        # (normalized query, limit) -> (time cached, results)
+        self._search_cache: "OrderedDict[Tuple[str, int], Tuple[float, List[str]]]" = OrderedDict()
 
     async def initialize(self) -> None:
         """
@@ -76,37 +103,59 @@ class MemorySystem:
             self._initialized = True
             # Silently initialized - no output needed
 
-            # Auto-index key documentation on startup
-            # Silently fail if it doesn't work - memory is optional
-            try:
-                key_docs = ["README.md", "PROJECT_SUMMARY.md", "QUICKSTART.md"]
-                docs_added = False
-                for doc in key_docs:
-                    if Path(doc).exists():
-                        content = Path(doc).read_text(encoding="utf-8")
-                        await cognee_add(content)
-                        docs_added = True
-
-                if docs_added:
-                    await cognee_cognify()
-            except Exception:
-                # Silently fail - memory is optional
-                pass
+            self._file_hashes = _load_file_hashes()
+
+            # Auto-index key documentation in the background, so the agent
+            # is usable right away (Cognee handles concurrent searches)
+            self._bg_index = asyncio.create_task(self._auto_index_docs())
 
         except Exception as e:
             console.print(f"[dim red]Failed to initialize memory: {e}[/dim red]")
             self.enabled = False
 
+    async def _auto_index_docs(self) -> None:
+        """Index key documentation of the current project"""
+        # Silently fail if it doesn't work - memory is optional
+        try:
+            key_docs = ["README.md", "PROJECT_SUMMARY.md", "QUICKSTART.md"]
+            files = await asyncio.to_thread(_read_changed_files, key_docs, self._file_hashes)
+
+            count = await _add_texts([text for _, _, text in files]) if files else 0
+            if count > 0:
+                await cognee_cognify()
+                self._search_cache.clear()
+                self._remember_files(files, count)
+        except Exception:
+            # Silently fail - memory is optional
+            pass
+
+    async def shutdown(self) -> None:
+        """Stop background indexing that is still running"""
+        if self._bg_index is not None and not self._bg_index.done():
+            self._bg_index.cancel()
+            try:
+                await self._bg_index
+            except asyncio.CancelledError:
+                pass
+        self._bg_index = None
+
     async def index_text(self, text: str, metadata: Optional[dict] = None) -> bool:
         """
         Add text to memory and index it (cognify).
         """
-        if not self.enabled or not self._initialized:
+        return await self.index_batch([text])
+
+    async def index_batch(self, texts: Sequence[str]) -> bool:
+        """
+        Add several texts to memory and index them with a single cognify.
+        """
+        if not self.enabled or not self._initialized or not texts:
             return False
 
         try:
-            await cognee_add(text)
+            await _add_texts(texts)
             await cognee_cognify()
+            self._search_cache.clear()
             return True
         except Exception as e:
             # Silently fail for memory indexing - it's not critical
@@ -127,14 +176,25 @@ class MemorySystem:
         if not self.enabled or not self._initialized:
             return []
 
+        key = (query.strip().lower(), limit)
+        cached = self._search_cache.get(key)
+        if cached is not None and time.monotonic() - cached[0] < _SEARCH_CACHE_TTL:
+            self._search_cache.move_to_end(key)
+            return list(cached[1])
+
         try:
-            results = await cognee_search(query)
-            # Top N relevanteste nehmen
-            results = results[:limit] if len(results) > limit else results
-            return [str(r) for r in results]
+            # Top N relevanteste nehmen (only those are converted to text)
+            results = (await cognee_search(query))[:limit]
+            found = [str(r) for r in results]
         except Exception:
             return []
 
+        self._search_cache[key] = (time.monotonic(), found)
+        self._search_cache.move_to_end(key)
+        if len(self._search_cache) > _SEARCH_CACHE_SIZE:
+            self._search_cache.popitem(last=False)
+        return list(found)
+
     async def index_project_files(self, path: Path = Path(".")) -> None:
         """
         Index relevant project files (md, py, etc.)
@@ -143,30 +203,127 @@ class MemorySystem:
             return
 
         try:
-            # Simple filter for relevant files
-            extensions = {".md", ".py", ".txt", ".rst"}
-            
-            count = 0
-            for file_path in path.rglob("*"):
-                if file_path.is_file() and file_path.suffix in extensions:
-                    if ".git" in file_path.parts or "__pycache__" in file_path.parts:
-                        continue
-                        
-                    try:
-                        content = file_path.read_text(encoding="utf-8")
-                        await cognee_add(content)
-                        count += 1
-                    except Exception:
-                        continue
-            
+            # Walk and read files off the event loop (unchanged files are skipped)
+            files = await asyncio.to_thread(
+                _read_changed_files, _iter_project_files(path), self._file_hashes
+            )
+
+            count = await _add_texts([text for _, _, text in files]) if files else 0
+
             if count > 0:
                 console.print(f"[dim]Cognifying {count} files...[/dim]")
                 await cognee_cognify()
+                self._search_cache.clear()
+                self._remember_files(files, count)
                 console.print(f"[dim green]Indexed {count} files into memory.[/dim green]")
-                
+
         except Exception as e:
             console.print(f"[dim red]Project indexing failed: {e}[/dim red]")
 
+    def _remember_files(self, files: List[Tuple[str, str, str]], count: int) -> None:
+        """Record content hashes of indexed files (only if all of them were added)"""
+        if count < len(files):
+            return
+
+        self._file_hashes.update((path, digest) for path, digest, _ in files)
+        try:
+            _FILE_HASHES_PATH.parent.mkdir(parents=True, exist_ok=True)
+            _FILE_HASHES_PATH.write_bytes(json_compat.dumps(self._file_hashes))
+        except OSError:
+            pass
+
+
+async def _add_texts(texts: Sequence[str]) -> int:
+    """
+    Add texts to Cognee in one call, or concurrently one by one if the
+    installed version does not take a list
+
+    Returns:
+        Number of texts added
+    """
+    global _LIST_ADD_SUPPORTED
+
+    texts = list(texts)
+    if _LIST_ADD_SUPPORTED:
+        try:
+            await cognee_add(texts)
+            return len(texts)
+        except TypeError:
+            _LIST_ADD_SUPPORTED = False
+
+    semaphore = asyncio.Semaphore(_ADD_CONCURRENCY)
+
+    async def add(text: str) -> bool:
+        async with semaphore:
+            try:
+                await cognee_add(text)
+                return True
+            except Exception:
+                return False
+
+    added = await asyncio.gather(*(add(text) for text in texts))
+    return sum(added)
+
+
+def _iter_project_files(root: Path) -> Iterator[str]:
+    """Yield paths of indexable files under root, pruning skipped directories"""
+    stack = [str(root)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        if entry.name not in _SKIP_DIRS:
+                            stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        dot = entry.name.rfind(".")
+                        if dot > 0 and entry.name[dot:] in _INDEX_EXTENSIONS:
+                            yield entry.path
+        except OSError:
+            continue
+
+
+def _read_changed_files(
+    file_paths: Iterable[str], known: Dict[str, str]
+) -> List[Tuple[str, str, str]]:
+    """
+    Read files whose content changed since they were indexed (blocking, run in a thread)
+
+    Args:
+        file_paths: Candidate files (missing or unreadable ones are skipped)
+        known: Content hash by absolute path of files indexed before
+
+    Returns:
+        (absolute path, content hash, text) for each new or changed file
+    """
+    files = []
+    for file_path in file_paths:
+        try:
+            # One raw read and a single decode, no text-layer buffering
+            with open(file_path, "rb", buffering=0) as f:
+                data = f.readall()
+        except OSError:
+            continue
+
+        abs_path = os.path.abspath(file_path)
+        digest = hashlib.blake2b(data, digest_size=16).hexdigest()
+        if known.get(abs_path) == digest:
+            continue
+
+        try:
+            files.append((abs_path, digest, data.decode("utf-8")))
+        except UnicodeDecodeError:
+            continue
+    return files
+
+
+def _load_file_hashes() -> Dict[str, str]:
+    """Load content hashes of previously indexed files"""
+    try:
+        return json_compat.loads(_FILE_HASHES_PATH.read_bytes())
+    except (OSError, json_compat.JSONDecodeError):
+        return {}
+
 
 # Global instance
 _memory_system: Optional[MemorySystem] = None
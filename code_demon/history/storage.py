@@ -4,13 +4,23 @@ History Storage
 Store and retrieve session history
 """
 
-import json
+import os
+import sys
+import heapq
 import uuid
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from datetime import datetime
-from typing import List, Optional
+from typing import Any, BinaryIO, Dict, Final, Iterator, List, Optional, Sequence, Union
 from collections import Counter
 
+try:
+    import fcntl
+except ImportError:  # Windows: open journals can't be deleted, which guards them instead
+    fcntl = None
+
+from ..utils import json_compat
+
 from .types import (
     ChatSession,
     MessageRecord,
@@ -21,15 +31,47 @@ from .types import (
 )
 
 
+# Lookups used per record when rebuilding sessions from JSON
+_ROLE_BY_VALUE = {role.value: role for role in MessageRole}
+_fromiso = datetime.fromisoformat
+
+
+def _intern_optional(value: Optional[str]) -> Optional[str]:
+    return sys.intern(value) if value else value
+
+
+# Sidecar file with one summary line per saved session (read by get_stats)
+INDEX_FILENAME = "_index.jsonl"
+
+# get_stats covers this many of the most recent sessions
+STATS_SESSION_LIMIT = 1000
+
+# Reading this many session files or more is spread over a thread pool
+PARALLEL_READ_THRESHOLD = 16
+PARALLEL_READ_WORKERS = 8
+
+# Running sessions are journaled to {session_id}.journal.jsonl, one record per line
+JOURNAL_SUFFIX = ".journal.jsonl"
+
+
 class HistoryStorage:
     """Manages session history storage"""
 
-    def __init__(self, history_dir: Path):
+    def __init__(self, history_dir: Path, pretty: bool = False):
         self.history_dir = history_dir
+        # Indented session files are easier to read but about twice the size
+        self.pretty = pretty
         self.history_dir.mkdir(parents=True, exist_ok=True)
+        self.index_path = self.history_dir / INDEX_FILENAME
 
         # Current session
         self.current_session: Optional[ChatSession] = None
+        self._journal: Optional[BinaryIO] = None
+        # Opened on first append and kept for later sessions
+        self._index_file: Optional[BinaryIO] = None
+
+        # Save sessions whose process died before end_session
+        self._recover_journals()
 
     def start_session(self) -> ChatSession:
         """Start a new session"""
@@ -39,6 +81,19 @@ class HistoryStorage:
             start_time=datetime.now(),
             metadata=SessionMetadata(),
         )
+
+        # Unbuffered, so every record reaches the file as soon as it's written
+        self._close_journal()
+        self._journal = open(self._journal_path(session_id), "ab", buffering=0)
+        if fcntl is not None:
+            fcntl.flock(self._journal, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        self._append_journal(
+            {
+                "type": "start",
+                "session_id": session_id,
+                "start_time": self.current_session.start_time,
+            }
+        )
         return self.current_session
 
     def end_session(self, success: bool = True) -> Optional[ChatSession]:
@@ -49,8 +104,9 @@ class HistoryStorage:
         self.current_session.end_time = datetime.now()
         self.current_session.metadata.success = success
 
-        # Save to disk
+        # Save to disk; the journal is no longer needed once the session file exists
         self._save_session(self.current_session)
+        self._close_journal(remove=True)
 
         session = self.current_session
         self.current_session = None
@@ -70,6 +126,7 @@ class HistoryStorage:
             tool_calls=tool_calls or [],
         )
         self.current_session.messages.append(message)
+        self._append_journal({"type": "message", "record": message})
 
     def add_tool_call(self, tool_call: ToolCallRecord) -> None:
         """Add a tool call to current session"""
@@ -77,6 +134,32 @@ class HistoryStorage:
             return
 
         self.current_session.tools_called.append(tool_call)
+        self._append_journal({"type": "tool_call", "record": tool_call})
+
+    def add_tool_calls(self, tool_calls: List[ToolCallRecord]) -> None:
+        """Add several tool calls to current session at once"""
+        if not self.current_session:
+            return
+
+        self.current_session.tools_called.extend(tool_calls)
+        self._append_journal(
+            *({"type": "tool_call", "record": tool_call} for tool_call in tool_calls)
+        )
+
+    def add_batch(self, records: Sequence[Union[MessageRecord, ToolCallRecord]]) -> None:
+        """Add message and tool call records to current session (one journal write)"""
+        if not self.current_session:
+            return
+
+        entries = []
+        for record in records:
+            if isinstance(record, MessageRecord):
+                self.current_session.messages.append(record)
+                entries.append({"type": "message", "record": record})
+            else:
+                self.current_session.tools_called.append(record)
+                entries.append({"type": "tool_call", "record": record})
+        self._append_journal(*entries)
 
     def add_achievement(self, achievement_id: str) -> None:
         """Add an achievement to current session"""
@@ -84,88 +167,302 @@ class HistoryStorage:
             return
 
         self.current_session.achievements_earned.append(achievement_id)
+        self._append_journal({"type": "achievement", "id": achievement_id})
+
+    def _journal_path(self, session_id: str) -> Path:
+        return self.history_dir / f"{session_id}{JOURNAL_SUFFIX}"
+
+    def _append_journal(self, *records: Dict[str, Any]) -> None:
+        """Append records to the running session's journal (one write per call)"""
+        if self._journal is None or not records:
+            return
+        try:
+            self._journal.write(b"".join(json_compat.dumps(r) + b"\n" for r in records))
+        except OSError:
+            pass  # The in-memory session is still saved by end_session
+
+    def _close_journal(self, remove: bool = False) -> None:
+        """Close the journal file, deleting it if requested"""
+        if self._journal is None:
+            return
+        path = Path(self._journal.name)
+        self._journal.close()
+        self._journal = None
+        if remove:
+            path.unlink(missing_ok=True)
+
+    def _recover_journals(self) -> None:
+        """Save sessions left behind as journals by a process that didn't finish"""
+        for journal_path in self.history_dir.glob(f"*{JOURNAL_SUFFIX}"):
+            try:
+                with open(journal_path, "rb") as f:
+                    if fcntl is not None:
+                        # Still locked means another process is running that session
+                        fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    session = self._journal_to_session(f)
+                # On Windows this fails while the owning process has it open
+                journal_path.unlink()
+            except OSError:
+                continue
+            if session is not None:
+                self._save_session(session, flush=False)
+
+        if self._index_file is not None:
+            self._index_file.flush()
+
+    def _journal_to_session(self, lines: BinaryIO) -> Optional[ChatSession]:
+        """Rebuild a session from its journal records"""
+        data: Dict[str, Any] = {
+            "messages": [],
+            "tools_called": [],
+            "metadata": {},
+            "achievements_earned": [],
+        }
+        for line in lines:
+            try:
+                record = json_compat.loads(line)
+            except (UnicodeDecodeError, json_compat.JSONDecodeError):
+                break  # A line cut short by the crash; everything before it is intact
+
+            kind = record.get("type")
+            if kind == "start":
+                data["session_id"] = record["session_id"]
+                data["start_time"] = record["start_time"]
+            elif kind == "message":
+                data["messages"].append(record["record"])
+            elif kind == "tool_call":
+                data["tools_called"].append(record["record"])
+            elif kind == "achievement":
+                data["achievements_earned"].append(record["id"])
+
+        if "session_id" not in data:
+            return None
+        try:
+            session = self._dict_to_session(data)
+        except Exception:
+            return None
+
+        # The session ended with its last recorded activity. The app ends every
+        # session it gets to close as successful, so a crash doesn't count as a
+        # failure either.
+        last_records = session.messages[-1:] + session.tools_called[-1:]
+        session.end_time = max((r.timestamp for r in last_records), default=session.start_time)
+        session.metadata.success = True
+        return session
 
-    def _save_session(self, session: ChatSession) -> None:
-        """Save session to disk"""
+    def _save_session(self, session: ChatSession, flush: bool = True) -> None:
+        """Save session to disk (flush=False leaves the index write buffered)"""
         # Create filename from session ID and timestamp
-        filename = f"{session.start_time.strftime('%Y%m%d_%H%M%S')}_{session.session_id[:8]}.json"
+        t = session.start_time
+        filename = (
+            f"{t.year:04d}{t.month:02d}{t.day:02d}_{t.hour:02d}{t.minute:02d}{t.second:02d}"
+            f"_{session.session_id[:8]}.json"
+        )
         file_path = self.history_dir / filename
 
-        # Convert to dict
-        session_dict = {
+        file_path.write_bytes(json_compat.dumps(self._session_to_dict(session), indent=self.pretty))
+
+        # Keep the stats index in step (built from all files if it doesn't exist yet)
+        if self._index_file is None and not self.index_path.exists():
+            self._rebuild_index()
+            return
+
+        if self._index_file is None:
+            self._index_file = open(self.index_path, "ab", buffering=1 << 16)
+        summary = self._session_summary(session, filename)
+        self._index_file.write(json_compat.dumps(summary) + b"\n")
+        if flush:
+            self._index_file.flush()
+
+    def close(self) -> None:
+        """Close the open journal and index files"""
+        self._close_journal()
+        self._close_index()
+
+    def _close_index(self) -> None:
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+
+    def _session_to_dict(self, session: ChatSession) -> Dict[str, Any]:
+        """Build the on-disk form of a session
+
+        Each tool call is stored once in tools_called; messages refer to their
+        calls by index. Calls missing from tools_called stay inline. Dataclasses,
+        enums and datetimes serialize directly.
+        """
+        ref_by_id = {id(tc): i for i, tc in enumerate(session.tools_called)}
+
+        messages = []
+        for message in session.messages:
+            refs = []
+            inline = []
+            for tc in message.tool_calls:
+                ref = ref_by_id.get(id(tc))
+                if ref is None:
+                    inline.append(tc)
+                else:
+                    refs.append(ref)
+
+            entry = {
+                "role": message.role,
+                "content": message.content,
+                "timestamp": message.timestamp,
+                "tool_call_refs": refs,
+            }
+            if inline:
+                entry["tool_calls"] = inline
+            messages.append(entry)
+
+        return {
+            "session_id": session.session_id,
+            "start_time": session.start_time,
+            "end_time": session.end_time,
+            "messages": messages,
+            "tools_called": session.tools_called,
+            "metadata": session.metadata,
+            "achievements_earned": session.achievements_earned,
+        }
+
+    def _session_summary(self, session: ChatSession, file_name: str) -> Dict[str, Any]:
+        """Summarize a session for the stats index"""
+        return {
+            "file": file_name,
             "session_id": session.session_id,
             "start_time": session.start_time.isoformat(),
             "end_time": session.end_time.isoformat() if session.end_time else None,
-            "messages": [
-                {
-                    "role": msg.role.value,
-                    "content": msg.content,
-                    "timestamp": msg.timestamp.isoformat(),
-                    "tool_calls": [
-                        {
-                            "tool": tc.tool,
-                            "arguments": tc.arguments,
-                            "result": tc.result,
-                            "success": tc.success,
-                            "timestamp": tc.timestamp.isoformat(),
-                            "duration_ms": tc.duration_ms,
-                        }
-                        for tc in msg.tool_calls
-                    ],
-                }
-                for msg in session.messages
-            ],
-            "tools_called": [
-                {
-                    "tool": tc.tool,
-                    "arguments": tc.arguments,
-                    "result": tc.result,
-                    "success": tc.success,
-                    "timestamp": tc.timestamp.isoformat(),
-                    "duration_ms": tc.duration_ms,
-                }
-                for tc in session.tools_called
-            ],
-            "metadata": {
-                "problem": session.metadata.problem,
-                "solution": session.metadata.solution,
-                "tags": session.metadata.tags,
-                "success": session.metadata.success,
-                "user_rating": session.metadata.user_rating,
-            },
-            "achievements_earned": session.achievements_earned,
+            "success": session.metadata.success,
+            "problem": session.metadata.problem,
+            "tool_counts": Counter(tc.tool for tc in session.tools_called),
+            "message_count": len(session.messages),
+            "tools_called_count": len(session.tools_called),
+            "duration_minutes": session.duration_minutes() if session.end_time else None,
+        }
+
+    def _summarize_session_dict(self, data: dict, file_name: str) -> Dict[str, Any]:
+        """Summarize a parsed session file without building the dataclasses"""
+        tools_called = data.get("tools_called", [])
+        metadata = data["metadata"]
+        end_time = data.get("end_time")
+        duration = (
+            (_fromiso(end_time) - _fromiso(data["start_time"])).total_seconds() / 60
+            if end_time
+            else None
+        )
+        return {
+            "file": file_name,
+            "session_id": data["session_id"],
+            "start_time": data["start_time"],
+            "end_time": end_time,
+            "success": metadata.get("success", False),
+            "problem": metadata.get("problem"),
+            "tool_counts": Counter(tc["tool"] for tc in tools_called),
+            "message_count": len(data.get("messages", [])),
+            "tools_called_count": len(tools_called),
+            "duration_minutes": duration,
         }
 
-        # Write to file
-        with open(file_path, "w", encoding="utf-8") as f:
-            json.dump(session_dict, f, indent=2, ensure_ascii=False)
+    def _rebuild_index(self) -> Dict[str, Dict[str, Any]]:
+        """Rebuild the stats index from the session files, returning its rows by file"""
+        rows: Dict[str, Dict[str, Any]] = {}
+        paths = sorted(self.history_dir.glob("*.json"))
+        for path, data in zip(paths, self._read_session_files(paths)):
+            try:
+                rows[path.name] = self._summarize_session_dict(data, path.name)
+            except (KeyError, TypeError, AttributeError):
+                # Listed without a summary, so the file doesn't trigger another rebuild
+                rows[path.name] = {"file": path.name}
+
+        self._write_index(rows)
+        return rows
+
+    def _write_index(self, rows: Dict[str, Dict[str, Any]]) -> None:
+        """Replace the stats index with one line per session file"""
+        # The cached handle would keep appending to the replaced file
+        self._close_index()
+        tmp_path = self.index_path.with_suffix(".tmp")
+        tmp_path.write_bytes(b"".join(json_compat.dumps(row) + b"\n" for row in rows.values()))
+        tmp_path.replace(self.index_path)
+
+    def _load_index(self) -> List[Dict[str, Any]]:
+        """Load session summaries from the stats index (latest entry per session file)
+
+        The index is rebuilt if it doesn't list exactly the session files in
+        the directory, and compacted if sessions were saved more than once.
+        """
+        if self._index_file is not None:
+            self._index_file.flush()
+
+        names = {name for name in os.listdir(self.history_dir) if name.endswith(".json")}
+        try:
+            lines = self.index_path.read_bytes().splitlines()
+        except OSError:
+            lines = None
+
+        rows: Dict[str, Dict[str, Any]] = {}
+        for line in lines or ():
+            try:
+                row = json_compat.loads(line)
+            except (UnicodeDecodeError, json_compat.JSONDecodeError):
+                continue  # e.g. a line cut short by a crash
+            rows[row.get("file")] = row
+
+        if lines is None or rows.keys() != names:
+            rows = self._rebuild_index()
+        elif len(lines) > len(rows):
+            self._write_index(rows)
+
+        return [row for row in rows.values() if "session_id" in row]
 
     def load_session(self, session_id: str) -> Optional[ChatSession]:
         """Load a session by ID"""
-        # Find session file
-        for file_path in self.history_dir.glob("*.json"):
-            try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    if data.get("session_id") == session_id:
-                        return self._dict_to_session(data)
-            except Exception:
-                continue
+        # Session files are named after the ID's first 8 characters, so only
+        # those need parsing; anything else is scanned only if none match
+        named = list(self.history_dir.glob(f"*_{session_id[:8]}.json"))
+        for candidates in (named, list(self.history_dir.glob("*.json"))):
+            for data in self._read_session_files(candidates):
+                if data is not None and data.get("session_id") == session_id:
+                    return self._dict_to_session(data)
         return None
 
+    def _read_session_files(self, paths: List[Path]) -> Iterator[Optional[dict]]:
+        """Parse session files in order, reading ahead on a thread pool for large batches
+
+        Closing the iterator early (e.g. after a match) cancels the pending reads.
+        """
+        if len(paths) < PARALLEL_READ_THRESHOLD:
+            yield from map(self._read_session_file, paths)
+            return
+
+        executor = ThreadPoolExecutor(max_workers=PARALLEL_READ_WORKERS)
+        try:
+            yield from executor.map(self._read_session_file, paths)
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _read_session_file(self, file_path: Path) -> Optional[dict]:
+        """Parse a session file (None if it can't be read)"""
+        try:
+            return json_compat.loads(file_path.read_bytes())
+        except (OSError, UnicodeDecodeError, json_compat.JSONDecodeError):
+            return None
+
     def list_sessions(self, limit: int = 50) -> List[ChatSession]:
         """List recent sessions"""
         sessions = []
 
-        for file_path in sorted(self.history_dir.glob("*.json"), reverse=True):
-            if len(sessions) >= limit:
-                break
+        # Filenames start with YYYYMMDD_HHMMSS, so the newest sort last by name
+        names = heapq.nlargest(
+            limit,
+            (name for name in os.listdir(self.history_dir) if name.endswith(".json")),
+        )
+
+        for data in self._read_session_files([self.history_dir / name for name in names]):
+            if data is None:
+                continue
 
             try:
-                with open(file_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                    session = self._dict_to_session(data)
-                    sessions.append(session)
+                sessions.append(self._dict_to_session(data))
             except Exception:
                 continue
 
@@ -173,9 +470,11 @@ class HistoryStorage:
 
     def get_stats(self) -> HistoryStats:
         """Get statistics about session history"""
-        sessions = self.list_sessions(limit=1000)
+        rows = self._load_index()
+        if len(rows) > STATS_SESSION_LIMIT:
+            rows = heapq.nlargest(STATS_SESSION_LIMIT, rows, key=lambda r: r["start_time"])
 
-        if not sessions:
+        if not rows:
             return HistoryStats(
                 total_sessions=0,
                 successful_sessions=0,
@@ -187,31 +486,27 @@ class HistoryStorage:
                 total_messages=0,
             )
 
-        successful = sum(1 for s in sessions if s.metadata.success)
-        failed = len(sessions) - successful
+        successful = sum(1 for r in rows if r["success"])
+        failed = len(rows) - successful
 
         # Count tool usage
         tool_counts = Counter()
-        for session in sessions:
-            for tool_call in session.tools_called:
-                tool_counts[tool_call.tool] += 1
+        for row in rows:
+            tool_counts.update(row["tool_counts"])
 
         # Count problems
-        problem_counts = Counter()
-        for session in sessions:
-            if session.metadata.problem:
-                problem_counts[session.metadata.problem] += 1
+        problem_counts = Counter(r["problem"] for r in rows if r["problem"])
 
-        # Calculate average duration
-        durations = [s.duration_minutes() for s in sessions if s.end_time]
+        # Calculate average duration (precomputed when the row was written)
+        durations = [r["duration_minutes"] for r in rows if r["duration_minutes"] is not None]
         avg_duration = sum(durations) / len(durations) if durations else 0.0
 
         # Total counts
-        total_tool_calls = sum(len(s.tools_called) for s in sessions)
-        total_messages = sum(len(s.messages) for s in sessions)
+        total_tool_calls = sum(r["tools_called_count"] for r in rows)
+        total_messages = sum(r["message_count"] for r in rows)
 
         return HistoryStats(
-            total_sessions=len(sessions),
+            total_sessions=len(rows),
             successful_sessions=successful,
             failed_sessions=failed,
             most_used_tools=tool_counts.most_common(10),
@@ -223,44 +518,28 @@ class HistoryStorage:
 
     def _dict_to_session(self, data: dict) -> ChatSession:
         """Convert dict to ChatSession"""
+        tools_called = [self._dict_to_tool_call(tc) for tc in data.get("tools_called", [])]
+
         return ChatSession(
             session_id=data["session_id"],
-            start_time=datetime.fromisoformat(data["start_time"]),
+            start_time=_fromiso(data["start_time"]),
             end_time=(
-                datetime.fromisoformat(data["end_time"]) if data.get("end_time") else None
+                _fromiso(data["end_time"]) if data.get("end_time") else None
             ),
             messages=[
                 MessageRecord(
-                    role=MessageRole(msg["role"]),
+                    role=_ROLE_BY_VALUE[msg["role"]],
                     content=msg["content"],
-                    timestamp=datetime.fromisoformat(msg["timestamp"]),
-                    tool_calls=[
-                        ToolCallRecord(
-                            tool=tc["tool"],
-                            arguments=tc["arguments"],
-                            result=tc["result"],
-                            success=tc["success"],
-                            timestamp=datetime.fromisoformat(tc["timestamp"]),
-                            duration_ms=tc["duration_ms"],
-                        )
-                        for tc in msg.get("tool_calls", [])
-                    ],
+                    timestamp=_fromiso(msg["timestamp"]),
+                    # Messages point into tools_called; older files inline the records
+                    tool_calls=[tools_called[i] for i in msg.get("tool_call_refs", ())]
+                    + [self._dict_to_tool_call(tc) for tc in msg.get("tool_calls", ())],
                 )
                 for msg in data.get("messages", [])
             ],
-            tools_called=[
-                ToolCallRecord(
-                    tool=tc["tool"],
-                    arguments=tc["arguments"],
-                    result=tc["result"],
-                    success=tc["success"],
-                    timestamp=datetime.fromisoformat(tc["timestamp"]),
-                    duration_ms=tc["duration_ms"],
-                )
-                for tc in data.get("tools_called", [])
-            ],
+            tools_called=tools_called,
             metadata=SessionMetadata(
-                problem=data["metadata"].get("problem"),
+                problem=_intern_optional(data["metadata"].get("problem")),
                 solution=data["metadata"].get("solution"),
                 tags=data["metadata"].get("tags", []),
                 success=data["metadata"].get("success", False),
@@ -269,23 +548,37 @@ class HistoryStorage:
             achievements_earned=data.get("achievements_earned", []),
         )
 
+    def _dict_to_tool_call(self, tc: dict) -> ToolCallRecord:
+        return ToolCallRecord(
+            # A handful of distinct tool names repeat across every session
+            tool=sys.intern(tc["tool"]),
+            arguments=tc["arguments"],
+            result=tc["result"],
+            success=tc["success"],
+            timestamp=_fromiso(tc["timestamp"]),
+            duration_ms=tc["duration_ms"],
+        )
+
 
 # Global storage instance
 _storage: Optional[HistoryStorage] = None
 
+# Resolved once at import
+_DEFAULT_HISTORY_DIR: Final = Path.home() / ".code-demon" / "history"
+
 
 def get_history_storage(history_dir: Optional[Path] = None) -> HistoryStorage:
     """Get the global history storage instance"""
     global _storage
     if _storage is None:
-        if history_dir is None:
-            history_dir = Path.home() / ".code-demon" / "history"
-        _storage = HistoryStorage(history_dir)
+        _storage = HistoryStorage(history_dir or _DEFAULT_HISTORY_DIR)
     return _storage
 
 
 def reset_history_storage() -> None:
     """Reset the global history storage"""
     global _storage
+    if _storage is not None:
+        _storage.close()
     _storage = None
 
@@ -19,7 +19,7 @@ class MessageRole(str, Enum):
     TOOL = "tool"
 
 
-@dataclass
+@dataclass(slots=True)
 class ToolCallRecord:
     """Record of a tool call"""
 
@@ -31,7 +31,7 @@ class ToolCallRecord:
     duration_ms: int
 
 
-@dataclass
+@dataclass(slots=True)
 class MessageRecord:
     """Record of a message in conversation"""
 
@@ -41,7 +41,7 @@ class MessageRecord:
     tool_calls: List[ToolCallRecord] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True)
 class SessionMetadata:
     """Metadata about a session"""
 
@@ -52,7 +52,7 @@ class SessionMetadata:
     user_rating: Optional[int] = None  # 1-5
 
 
-@dataclass
+@dataclass(slots=True)
 class ChatSession:
     """A complete chat session"""
 
@@ -80,7 +80,7 @@ class ChatSession:
         return len(self.tools_called)
 
 
-@dataclass
+@dataclass(slots=True)
 class HistoryStats:
     """Statistics about session history"""
 
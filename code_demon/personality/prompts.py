@@ -124,12 +124,14 @@ Du: "Super! Der Code läuft jetzt einwandfrei. Gut gemacht! 🎉"
 """
 
 
+_PROMPTS = {
+    "cynical": CYNICAL_PROMPT,
+    "professional": PROFESSIONAL_PROMPT,
+    "friendly": FRIENDLY_PROMPT,
+}
+
+
 def get_system_prompt(personality: PersonalityType = "cynical") -> str:
     """Get system prompt for specified personality"""
-    prompts = {
-        "cynical": CYNICAL_PROMPT,
-        "professional": PROFESSIONAL_PROMPT,
-        "friendly": FRIENDLY_PROMPT,
-    }
-    return prompts.get(personality, CYNICAL_PROMPT)
+    return _PROMPTS.get(personality, CYNICAL_PROMPT)
 
@@ -5,9 +5,112 @@ Execute shell commands safely
 """
 
 import asyncio
+import os
 import shlex
+import signal
 from pathlib import Path
+import tempfile
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, Dict, Tuple
 from ..registry import Tool, ToolMetadata, ToolCategory, ToolParameter
+from .forkserver import ForkedRun, ForkServerError, get_fork_server
+
+try:
+    from asyncio import timeout as _timeout  # Python 3.11+
+except ImportError:
+    from async_timeout import timeout as _timeout  # installed with aiohttp on 3.10
+
+# Output is kept in memory up to this size per stream, then spooled to disk
+_SPOOL_MAX_SIZE = 1 << 20
+
+# Requested pipe capacity (Linux F_SETPIPE_SZ; ignored elsewhere) and read size,
+# so chatty processes block less and output is drained in fewer reads
+_PIPE_SIZE = 1 << 20
+_READ_CHUNK_SIZE = _PIPE_SIZE
+
+
+def _pipe_options() -> Dict[str, int]:
+    """Subprocess options for large output pipes on the running event loop
+
+    pipesize is only understood by the stdlib loop; uvloop (installed with the
+    speedups extra) rejects unknown Popen arguments, so it keeps default pipes.
+    """
+    options = {"limit": _PIPE_SIZE}
+    if isinstance(asyncio.get_running_loop(), asyncio.BaseEventLoop):
+        options["pipesize"] = _PIPE_SIZE
+    return options
+
+
+# Time a process gets to exit after SIGTERM before it is killed
+_KILL_GRACE_PERIOD = 2.0
+
+
+def _signal(process: "asyncio.subprocess.Process | ForkedRun", force: bool) -> None:
+    """Terminate (or with force, kill) a subprocess along with anything it spawned
+
+    The executors start their processes in a new session, so on POSIX the
+    whole process group can be signalled; otherwise a shell's children would
+    keep the output pipes open after the shell itself is gone.
+    """
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(process.pid, signal.SIGKILL if force else signal.SIGTERM)
+        elif force:
+            process.kill()
+        else:
+            process.terminate()
+    except ProcessLookupError:
+        pass
+
+
+async def _terminate(process: "asyncio.subprocess.Process | ForkedRun") -> None:
+    """Stop a running subprocess and reap it
+
+    Sends SIGTERM first and SIGKILL if it is still running after the grace period.
+    """
+    _signal(process, force=False)
+    try:
+        async with _timeout(_KILL_GRACE_PERIOD):
+            await process.wait()
+            return
+    except asyncio.TimeoutError:
+        pass
+    _signal(process, force=True)
+    await process.wait()
+
+
+async def _drain(reader: asyncio.StreamReader, sink: BinaryIO) -> None:
+    """Copy a subprocess pipe into sink until EOF"""
+    while chunk := await reader.read(_READ_CHUNK_SIZE):
+        sink.write(chunk)
+
+
+async def _collect_output(
+    process: asyncio.subprocess.Process, timeout: float
+) -> Tuple[bytes, bytes]:
+    """Read stdout and stderr while the process runs and return them once it exits
+
+    Raises asyncio.TimeoutError (after stopping the process) if it doesn't
+    finish within timeout seconds.
+    """
+    with SpooledTemporaryFile(max_size=_SPOOL_MAX_SIZE) as stdout, SpooledTemporaryFile(
+        max_size=_SPOOL_MAX_SIZE
+    ) as stderr:
+        try:
+            async with _timeout(timeout):
+                await asyncio.gather(
+                    _drain(process.stdout, stdout),
+                    _drain(process.stderr, stderr),
+                    process.wait(),
+                )
+        finally:
+            # Timed out, cancelled or failed: don't leave a zombie or open pipes behind
+            if process.returncode is None:
+                await _terminate(process)
+
+        stdout.seek(0)
+        stderr.seek(0)
+        return stdout.read(), stderr.read()
 
 
 class ExecuteCommandTool(Tool):
@@ -70,12 +173,12 @@ class ExecuteCommandTool(Tool):
                     stdout=asyncio.subprocess.PIPE,
                     stderr=asyncio.subprocess.PIPE,
                     cwd=str(work_dir) if work_dir else None,
+                    start_new_session=True,
+                    **_pipe_options(),
                 )
 
                 # Wait for completion with timeout
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(), timeout=timeout
-                )
+                stdout, stderr = await _collect_output(process, timeout)
 
                 # Decode output
                 stdout_text = stdout.decode("utf-8", errors="ignore")
@@ -144,9 +247,6 @@ class RunPythonTool(Tool):
                 return "Error: Empty code"
 
             # Create temp file
-            import tempfile
-            import os
-
             with tempfile.NamedTemporaryFile(
                 mode="w", suffix=".py", delete=False
             ) as f:
@@ -155,16 +255,7 @@ class RunPythonTool(Tool):
 
             try:
                 # Execute Python script
-                process = await asyncio.create_subprocess_exec(
-                    "python3",
-                    temp_file,
-                    stdout=asyncio.subprocess.PIPE,
-                    stderr=asyncio.subprocess.PIPE,
-                )
-
-                stdout, stderr = await asyncio.wait_for(
-                    process.communicate(), timeout=timeout
-                )
+                returncode, stdout, stderr = await self._run_script(temp_file, timeout)
 
                 stdout_text = stdout.decode("utf-8", errors="ignore")
                 stderr_text = stderr.decode("utf-8", errors="ignore")
@@ -172,7 +263,7 @@ class RunPythonTool(Tool):
                 # Build result
                 output = []
                 output.append("🐍 Python Execution")
-                output.append(f"📍 Exit code: {process.returncode}")
+                output.append(f"📍 Exit code: {returncode}")
                 output.append("")
 
                 if stdout_text:
@@ -198,6 +289,47 @@ class RunPythonTool(Tool):
         except Exception as e:
             return f"Error running Python code: {str(e)}"
 
+    async def _run_script(self, script: str, timeout: float) -> Tuple[int, bytes, bytes]:
+        """Run a script file, forked from the warm fork server when possible"""
+        server = get_fork_server()
+        if server is not None:
+            fd, stdout_path = tempfile.mkstemp(suffix=".out")
+            os.close(fd)
+            fd, stderr_path = tempfile.mkstemp(suffix=".err")
+            os.close(fd)
+            try:
+                try:
+                    run = await server.start(script, stdout_path, stderr_path)
+                except ForkServerError:
+                    run = None  # Fall back to a fresh interpreter below
+
+                if run is not None:
+                    try:
+                        async with _timeout(timeout):
+                            returncode = await run.wait()
+                    finally:
+                        if run.returncode is None:
+                            await _terminate(run)
+                    return (
+                        returncode,
+                        Path(stdout_path).read_bytes(),
+                        Path(stderr_path).read_bytes(),
+                    )
+            finally:
+                os.unlink(stdout_path)
+                os.unlink(stderr_path)
+
+        process = await asyncio.create_subprocess_exec(
+            "python3",
+            script,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+            start_new_session=True,
+            **_pipe_options(),
+        )
+        stdout, stderr = await _collect_output(process, timeout)
+        return process.returncode, stdout, stderr
+
 
 class RunTestsTool(Tool):
     """Tool to run tests"""
@@ -266,9 +398,11 @@ class RunTestsTool(Tool):
                 stdout=asyncio.subprocess.PIPE,
                 stderr=asyncio.subprocess.PIPE,
                 cwd=str(work_dir),
+                start_new_session=True,
+                **_pipe_options(),
             )
 
-            stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=120)
+            stdout, stderr = await _collect_output(process, 120)
 
             stdout_text = stdout.decode("utf-8", errors="ignore")
             stderr_text = stderr.decode("utf-8", errors="ignore")
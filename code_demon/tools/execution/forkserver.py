@@ -0,0 +1,255 @@
+"""
+Python Fork Server
+
+A warm python3 process that forks a fresh child for every script run,
+so run_python doesn't pay interpreter startup on each call (POSIX only)
+"""
+
+import asyncio
+import itertools
+import os
+import signal
+from typing import Dict, Optional
+
+from ...utils import json_compat
+
+# Runs inside the server interpreter (stdlib only, any python3). Requests and
+# replies are JSON lines on stdin/stdout. Each run is forked into its own
+# session, with stdin from /dev/null, stdout/stderr going to the files named
+# in the request, and the working directory and environment of the caller.
+# Exits are reported from the SIGCHLD handler; the signal stays blocked until
+# the matching "started" reply has been written.
+#
+# A run behaves like "python3 script.py" (non-daemon threads are joined, then
+# atexit handlers run), except that the modules the server itself imported
+# (json, os, runpy, signal, sys, traceback and their dependencies) are
+# already loaded, and interpreter-wide settings such as PYTHONHASHSEED are
+# taken from the environment the server was started with.
+_SERVER_SOURCE = r"""
+import json, os, runpy, signal, sys, traceback
+
+def reply(message):
+    os.write(1, (json.dumps(message) + "\n").encode())
+
+def reap(signum, frame):
+    while True:
+        try:
+            pid, status = os.waitpid(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        reply({"pid": pid, "returncode": os.waitstatus_to_exitcode(status)})
+
+def run(request):
+    os.setsid()
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGCHLD})
+    os.dup2(os.open(os.devnull, os.O_RDONLY), 0)
+    os.dup2(os.open(request["stdout"], os.O_WRONLY | os.O_TRUNC), 1)
+    os.dup2(os.open(request["stderr"], os.O_WRONLY | os.O_TRUNC), 2)
+    sys.stdin = open(0, closefd=False)
+    sys.stdout = open(1, "w", closefd=False)
+    sys.stderr = open(2, "w", errors="backslashreplace", closefd=False)
+
+    script = request["script"]
+    os.chdir(request["cwd"])
+    os.environ.clear()
+    os.environ.update(request["env"])
+    sys.argv = [script]
+    sys.path[0] = os.path.dirname(script)
+    code = 0
+    try:
+        runpy.run_path(script, run_name="__main__")
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException as e:
+        # Report the traceback from the script's frames on, like python3 script.py
+        tb = e.__traceback__
+        while tb is not None and tb.tb_frame.f_code.co_filename != script:
+            tb = tb.tb_next
+        traceback.print_exception(type(e), e, tb)
+        code = 1
+    try:
+        # Interpreter shutdown order: wait for non-daemon threads, then atexit
+        if "threading" in sys.modules:
+            sys.modules["threading"]._shutdown()
+        import atexit
+        atexit._run_exitfuncs()
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(code & 0xFF)
+
+signal.signal(signal.SIGCHLD, reap)
+for line in sys.stdin.buffer:
+    request = json.loads(line)
+    signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGCHLD})
+    try:
+        pid = os.fork()
+        if pid == 0:
+            try:
+                run(request)
+            finally:
+                os._exit(1)
+        reply({"id": request["id"], "pid": pid})
+    except OSError as e:
+        reply({"id": request["id"], "error": str(e)})
+    finally:
+        signal.pthread_sigmask(signal.SIG_UNBLOCK, {signal.SIGCHLD})
+"""
+
+# Replies can carry long error messages
+_READ_LIMIT = 1 << 20
+
+
+class ForkServerError(Exception):
+    """The fork server couldn't start a run"""
+
+
+class ForkedRun:
+    """A script run in a forked child, with the parts of the
+    asyncio.subprocess.Process interface the executors use"""
+
+    def __init__(self, pid: int, exited: "asyncio.Future[int]"):
+        self.pid = pid
+        self._exited = exited
+
+    @property
+    def returncode(self) -> Optional[int]:
+        if self._exited.done() and not self._exited.exception():
+            return self._exited.result()
+        return None
+
+    async def wait(self) -> int:
+        return await asyncio.shield(self._exited)
+
+    def terminate(self) -> None:
+        os.kill(self.pid, signal.SIGTERM)
+
+    def kill(self) -> None:
+        os.kill(self.pid, signal.SIGKILL)
+
+
+class ForkServer:
+    """Manages the fork server process (started on first use)"""
+
+    def __init__(self, python: str = "python3"):
+        self.python = python
+        self._process: Optional[asyncio.subprocess.Process] = None
+        self._reader: Optional[asyncio.Task] = None
+        self._ids = itertools.count()
+        self._starting: Dict[int, asyncio.Future] = {}
+        self._exits: Dict[int, asyncio.Future] = {}
+
+    async def start(self, script: str, stdout_path: str, stderr_path: str) -> ForkedRun:
+        """Fork a child running script; raises ForkServerError if that isn't possible"""
+        process = await self._ensure_running()
+
+        request_id = next(self._ids)
+        started = asyncio.get_running_loop().create_future()
+        self._starting[request_id] = started
+        request = {
+            "id": request_id,
+            "script": script,
+            "stdout": stdout_path,
+            "stderr": stderr_path,
+            "cwd": os.getcwd(),
+            "env": dict(os.environ),
+        }
+        try:
+            process.stdin.write(json_compat.dumps(request) + b"\n")
+            await process.stdin.drain()
+            pid, exited = await started
+        except (ConnectionError, BrokenPipeError) as e:
+            raise ForkServerError(str(e)) from e
+        finally:
+            self._starting.pop(request_id, None)
+        return ForkedRun(pid, exited)
+
+    async def _ensure_running(self) -> asyncio.subprocess.Process:
+        if (
+            self._process is not None
+            and self._process.returncode is None
+            and not self._reader.done()
+        ):
+            return self._process
+
+        try:
+            self._process = await asyncio.create_subprocess_exec(
+                self.python,
+                "-c",
+                _SERVER_SOURCE,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                start_new_session=True,
+                limit=_READ_LIMIT,
+            )
+        except OSError as e:
+            raise ForkServerError(str(e)) from e
+        self._reader = asyncio.create_task(self._read_replies(self._process))
+        return self._process
+
+    async def _read_replies(self, process: asyncio.subprocess.Process) -> None:
+        """Resolve the futures of pending runs from the server's replies"""
+        loop = asyncio.get_running_loop()
+        try:
+            async for line in process.stdout:
+                reply = json_compat.loads(line)
+                if "id" in reply:
+                    started = self._starting.get(reply["id"])
+                    if started is None or started.done():
+                        continue
+                    if "error" in reply:
+                        started.set_exception(ForkServerError(reply["error"]))
+                    else:
+                        # Created here, so an exit reported right after is never missed
+                        exited = self._exits[reply["pid"]] = loop.create_future()
+                        started.set_result((reply["pid"], exited))
+                else:
+                    exited = self._exits.pop(reply["pid"], None)
+                    if exited is not None and not exited.done():
+                        exited.set_result(reply["returncode"])
+        finally:
+            # The server is gone: nothing pending will be answered
+            error = ForkServerError("Fork server exited")
+            for future in (*self._starting.values(), *self._exits.values()):
+                if not future.done():
+                    future.set_exception(error)
+            self._exits.clear()
+
+    async def aclose(self) -> None:
+        """Stop the server (runs still in progress keep going)"""
+        process, self._process = self._process, None
+        if process is None:
+            return
+        if process.returncode is None:
+            process.stdin.close()
+            await process.wait()
+        if self._reader is not None:
+            await self._reader
+            self._reader = None
+
+
+_server: Optional[ForkServer] = None
+
+
+def get_fork_server() -> Optional[ForkServer]:
+    """Get the global fork server (None where os.fork isn't available)"""
+    global _server
+    if _server is None and hasattr(os, "fork"):
+        _server = ForkServer()
+    return _server
+
+
+async def aclose_fork_server() -> None:
+    """Stop the global fork server if it was started"""
+    if _server is not None:
+        await _server.aclose()
@@ -40,6 +40,7 @@ class ReadFileTool(Tool):
             ],
             requires_approval=False,
             dangerous=False,
+            read_only=True,
             timeout=10,
         )
 
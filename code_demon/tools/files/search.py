@@ -4,12 +4,245 @@ Search Files Tool
 Search for files and content
 """
 
+import asyncio
+import mmap
 import os
 import re
+import shutil
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache
+from itertools import islice
 from pathlib import Path
-from typing import List, Tuple
+from typing import Callable, Deque, Iterator, List, Optional, Tuple
+from ...utils import json_compat
 from ..registry import Tool, ToolMetadata, ToolCategory, ToolParameter
 
+# Content search skips these directories (besides hidden ones), file types and sizes
+_SKIP_DIRS = ("node_modules", "__pycache__", "venv", "dist", "build")
+_SKIP_EXTENSIONS = (".pyc", ".so", ".o", ".jpg", ".png", ".gif", ".pdf", ".zip")
+_MAX_FILE_SIZE = 1024 * 1024
+
+# Files with a NUL byte this close to the start are treated as binary (like grep does)
+_BINARY_SNIFF_SIZE = 8192
+
+# Files at least this large are mapped rather than read
+_MMAP_MIN_SIZE = 64 * 1024
+
+# Characters that make a pattern a regex rather than plain text
+_REGEX_META = re.compile(r"[.^$*+?{}\[\]\\|()]")
+
+# Constructs that let a regex look past its own match, across line boundaries
+_LOOKAROUND = re.compile(r"\(\?<?[=!]|\\[AZ]")
+
+# Without ripgrep, files are read on this many threads, with at most
+# _SCAN_WINDOW of them queued ahead of the results consumed so far
+_SCAN_WORKERS = min(32, (os.cpu_count() or 1) + 4)
+_SCAN_WINDOW = 4 * _SCAN_WORKERS
+
+# ripgrep, when installed, does content searches natively
+_RG_PATH = shutil.which("rg")
+
+
+@lru_cache(maxsize=128)
+def _compile(pattern: str, flags: int) -> re.Pattern:
+    """Compile a search pattern, treating it as literal text if it isn't a valid regex"""
+    try:
+        return re.compile(pattern, flags)
+    except re.error:
+        return re.compile(re.escape(pattern), flags)
+
+
+def _walk(
+    top: Path, skip_dir: Callable[[str], bool]
+) -> Iterator[Tuple[str, int, List[os.DirEntry]]]:
+    """Walk a tree top-down like os.walk, yielding (dir path, depth, file entries)
+
+    Directories are visited in the same order as os.walk; those for which
+    skip_dir(name) is true, symlinked ones and unreadable ones are left out.
+    The DirEntry objects carry the type (and on Windows, stat) information
+    scandir already read.
+    """
+    stack: List[Tuple[str, int]] = [(str(top), 0)]
+    while stack:
+        root, depth = stack.pop()
+        files: List[os.DirEntry] = []
+        subdirs: List[str] = []
+        try:
+            with os.scandir(root) as entries:
+                for entry in entries:
+                    try:
+                        is_dir = entry.is_dir()
+                    except OSError:
+                        is_dir = False
+                    if not is_dir:
+                        files.append(entry)
+                    elif not skip_dir(entry.name) and not entry.is_symlink():
+                        subdirs.append(entry.path)
+        except OSError:
+            continue
+
+        yield root, depth, files
+        stack.extend((subdir, depth + 1) for subdir in reversed(subdirs))
+
+
+def _is_hidden(name: str) -> bool:
+    return name.startswith(".")
+
+
+def _skip_content_dir(name: str) -> bool:
+    return name.startswith(".") or name in _SKIP_DIRS
+
+
+def _sorted_entries(path: str) -> Iterator[os.DirEntry]:
+    """A directory's entries sorted by name (none if it can't be read)"""
+    try:
+        with os.scandir(path) as entries:
+            return iter(sorted(entries, key=lambda entry: entry.name))
+    except OSError:
+        return iter(())
+
+
+def _literal_needle(pattern: str, case_sensitive: bool) -> Optional[str]:
+    """The substring to look for if pattern can be matched without a regex, else None
+
+    Case-insensitive literals only qualify when ASCII, where lower() agrees
+    with re.IGNORECASE.
+    """
+    # Patterns that aren't valid regexes are searched as literal text
+    if _REGEX_META.search(pattern) and _compile(pattern, 0).pattern == pattern:
+        return None
+    if case_sensitive:
+        return pattern
+    return pattern.lower() if pattern.isascii() else None
+
+
+def _literal_starts(
+    needle: str, case_sensitive: bool, fallback: Callable[[str], Iterator[int]]
+) -> Callable[[str], Iterator[int]]:
+    """Match start positions for a literal needle via str.find, at most one per line"""
+
+    def starts(data: str) -> Iterator[int]:
+        if case_sensitive:
+            haystack = data
+        elif data.isascii():
+            haystack = data.lower()
+        else:
+            # lower() may change lengths (and positions) outside ASCII
+            yield from fallback(data)
+            return
+
+        find = haystack.find
+        pos = find(needle)
+        while pos != -1:
+            yield pos
+            line_end = find("\n", pos)
+            if line_end == -1:
+                return
+            pos = find(needle, line_end + 1)
+
+    return starts
+
+
+def _regex_starts(regex: re.Pattern) -> Callable[[str], Iterator[int]]:
+    """Match start positions for a compiled pattern, matched line by line
+
+    The whole text is scanned in one pass, but a match spanning a newline
+    (through \\s, [^...] and the like) isn't a match on any one line; the lines
+    it covers are searched on their own instead. Patterns that can look past
+    their match (lookarounds, \\A, \\Z) are always searched a line at a time.
+    """
+    search = regex.search
+
+    def search_lines(data: str, line_start: int, end: int) -> Iterator[int]:
+        # Every line from the one starting at line_start through the one holding end - 1
+        while line_start < end:
+            line_end = data.find("\n", line_start)
+            line_end = len(data) if line_end == -1 else line_end + 1
+            found = search(data[line_start:line_end])
+            if found:
+                yield line_start + found.start()
+            line_start = line_end
+
+    if _LOOKAROUND.search(regex.pattern):
+        return lambda data: search_lines(data, 0, len(data))
+
+    def starts(data: str) -> Iterator[int]:
+        resume = 0  # Lines before this were searched on their own
+        for match in regex.finditer(data):
+            start, end = match.span()
+            if end <= resume and start < resume:
+                continue
+            if start >= resume and "\n" not in match.group():
+                yield start
+                continue
+
+            line_start = max(data.rfind("\n", 0, start) + 1, resume)
+            yield from search_lines(data, line_start, end)
+            resume = data.find("\n", end - 1) + 1 or len(data)
+
+    return starts
+
+
+def _scan_file(
+    file_path: Path, root: Path, starts: Callable[[str], Iterator[int]], limit: int
+) -> List[str]:
+    """Search one file, returning at most limit result lines"""
+    results: List[str] = []
+    try:
+        with open(file_path, "rb") as f:
+            # Skip large files
+            size = os.fstat(f.fileno()).st_size
+            if size > _MAX_FILE_SIZE:
+                return results
+
+            # Larger files are decoded straight from the page cache
+            if size >= _MMAP_MIN_SIZE:
+                raw = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            else:
+                raw = f.read()
+    except (PermissionError, OSError, ValueError):
+        # Skip files we can't read (or that shrank to nothing before mapping)
+        return results
+
+    try:
+        # Skip binary files the extension list doesn't catch
+        if raw.find(b"\0", 0, _BINARY_SNIFF_SIZE) != -1:
+            return results
+        data = str(raw, "utf-8", "ignore")
+    finally:
+        if isinstance(raw, mmap.mmap):
+            raw.close()
+    if "\r" in data:
+        # Same line endings text mode would give
+        data = data.replace("\r\n", "\n").replace("\r", "\n")
+
+    # One pass over the whole file; line numbers come from
+    # counting newlines between consecutive matches
+    relative_path = file_path.relative_to(root)
+    line_num = 1
+    pos = 0
+    last_line = 0
+    for start in starts(data):
+        if start == len(data) and (not data or data[-1] == "\n"):
+            break  # Empty match past the last line
+        line_num += data.count("\n", pos, start)
+        pos = start
+        if line_num == last_line:
+            continue  # One result per line
+        last_line = line_num
+
+        line_start = data.rfind("\n", 0, start) + 1
+        line_end = data.find("\n", start)
+        if line_end == -1:
+            line_end = len(data)
+
+        results.append(f"📄 {relative_path}:{line_num}: {data[line_start:line_end].strip()}")
+        if len(results) >= limit:
+            break
+
+    return results
+
 
 class SearchFilesTool(Tool):
     """Tool to search for files and content"""
@@ -57,6 +290,7 @@ class SearchFilesTool(Tool):
             ],
             requires_approval=False,
             dangerous=False,
+            read_only=True,
             timeout=30,
         )
 
@@ -85,9 +319,15 @@ class SearchFilesTool(Tool):
                     search_path, pattern, case_sensitive, max_results
                 )
             elif search_type == "content":
-                results = self._search_content(
-                    search_path, pattern, case_sensitive, max_results
-                )
+                results = None
+                if _RG_PATH:
+                    results = await self._search_content_rg(
+                        search_path, pattern, case_sensitive, max_results
+                    )
+                if results is None:
+                    results = await asyncio.to_thread(
+                        self._search_content, search_path, pattern, case_sensitive, max_results
+                    )
             else:
                 return f"Error: Invalid search_type '{search_type}'. Use 'filename' or 'content'"
 
@@ -110,23 +350,19 @@ class SearchFilesTool(Tool):
     ) -> List[str]:
         """Search for files by filename pattern"""
         results = []
-        flags = 0 if case_sensitive else re.IGNORECASE
-
-        try:
-            regex = re.compile(pattern, flags)
-        except re.error:
-            # If pattern is not a valid regex, treat it as literal text
-            pattern_escaped = re.escape(pattern)
-            regex = re.compile(pattern_escaped, flags)
-
-        for root, dirs, files in os.walk(path):
-            # Skip hidden directories
-            dirs[:] = [d for d in dirs if not d.startswith(".")]
-
-            for filename in files:
-                if regex.search(filename):
-                    file_path = Path(root) / filename
-                    relative_path = file_path.relative_to(path)
+        needle = _literal_needle(pattern, case_sensitive)
+        if needle is None:
+            matches = _compile(pattern, 0 if case_sensitive else re.IGNORECASE).search
+        else:
+
+            def matches(name: str) -> bool:
+                return needle in (name if case_sensitive else name.lower())
+
+        # Skip hidden directories
+        for _, _, files in _walk(path, _is_hidden):
+            for entry in files:
+                if matches(entry.name):
+                    relative_path = Path(entry.path).relative_to(path)
                     results.append(f"📄 {relative_path}")
 
                     if len(results) >= max_results:
@@ -138,62 +374,124 @@ class SearchFilesTool(Tool):
         self, path: Path, pattern: str, case_sensitive: bool, max_results: int
     ) -> List[str]:
         """Search for text content within files"""
-        results = []
-        flags = 0 if case_sensitive else re.IGNORECASE
+        results: List[str] = []
+        flags = re.MULTILINE if case_sensitive else re.MULTILINE | re.IGNORECASE
+        starts = _regex_starts(_compile(pattern, flags))
+        needle = _literal_needle(pattern, case_sensitive)
+        if needle is not None:
+            starts = _literal_starts(needle, case_sensitive, starts)
+
+        # Files are read on a thread pool; results are still taken in walk order
+        executor = ThreadPoolExecutor(max_workers=_SCAN_WORKERS)
+        try:
+            pending: Deque[Future] = deque()
+            files = self._iter_content_files(path)
+            while True:
+                for file_path in islice(files, _SCAN_WINDOW - len(pending)):
+                    pending.append(
+                        executor.submit(_scan_file, file_path, path, starts, max_results)
+                    )
+                if not pending:
+                    return results
+
+                results.extend(pending.popleft().result())
+                if len(results) >= max_results:
+                    return results[:max_results]
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+    def _iter_content_files(self, path: Path) -> Iterator[Path]:
+        """Yield the files a content search looks at
+
+        Each directory's entries are visited by name, subdirectories in line
+        with files, so results come in the same order as rg --sort path.
+        """
+        stack: List[Iterator[os.DirEntry]] = [_sorted_entries(str(path))]
+        while stack:
+            entry = next(stack[-1], None)
+            if entry is None:
+                stack.pop()
+                continue
+
+            try:
+                is_dir = entry.is_dir()
+            except OSError:
+                is_dir = False
+            if is_dir:
+                # Skip hidden directories and common ignore patterns
+                if not _skip_content_dir(entry.name) and not entry.is_symlink():
+                    stack.append(_sorted_entries(entry.path))
+            # Skip binary files
+            elif not entry.name.endswith(_SKIP_EXTENSIONS):
+                yield Path(entry.path)
+
+    async def _search_content_rg(
+        self, path: Path, pattern: str, case_sensitive: bool, max_results: int
+    ) -> Optional[List[str]]:
+        """Search for text content with ripgrep (None if it couldn't run the search)"""
+        args = [
+            _RG_PATH,
+            "--json",
+            "--no-ignore",
+            "--hidden",
+            "--glob",
+            "!.*/",
+            "--max-filesize",
+            str(_MAX_FILE_SIZE),
+            "--case-sensitive" if case_sensitive else "--ignore-case",
+            # Deterministic order (as the Python search), so max_results keeps the same hits
+            "--sort",
+            "path",
+        ]
+        for name in _SKIP_DIRS:
+            args += ["--glob", f"!{name}/"]
+        for ext in _SKIP_EXTENSIONS:
+            args += ["--glob", f"!*{ext}"]
+        # Patterns that aren't valid regexes are searched as literal text, like _compile does
+        if _compile(pattern, 0).pattern != pattern:
+            args.append("--fixed-strings")
+        args += ["--regexp", pattern, "--", str(path)]
 
         try:
-            regex = re.compile(pattern, flags)
-        except re.error:
-            pattern_escaped = re.escape(pattern)
-            regex = re.compile(pattern_escaped, flags)
-
-        for root, dirs, files in os.walk(path):
-            # Skip hidden directories and common ignore patterns
-            dirs[:] = [
-                d
-                for d in dirs
-                if not d.startswith(".")
-                and d not in ["node_modules", "__pycache__", "venv", "dist", "build"]
-            ]
-
-            for filename in files:
-                # Skip binary and large files
-                if any(
-                    filename.endswith(ext)
-                    for ext in [
-                        ".pyc",
-                        ".so",
-                        ".o",
-                        ".jpg",
-                        ".png",
-                        ".gif",
-                        ".pdf",
-                        ".zip",
-                    ]
-                ):
+            process = await asyncio.create_subprocess_exec(
+                *args,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.DEVNULL,
+                # A match record holds the whole line, which may be a minified file
+                limit=4 * _MAX_FILE_SIZE,
+            )
+        except OSError:
+            return None
+
+        results: List[str] = []
+        try:
+            async for line in process.stdout:
+                record = json_compat.loads(line)
+                if record.get("type") != "match":
                     continue
 
-                file_path = Path(root) / filename
-
+                data = record["data"]
+                file_name = data["path"].get("text")
+                text = data["lines"].get("text")
+                if file_name is None or text is None:
+                    continue  # Not valid UTF-8
+
+                relative_path = Path(file_name).relative_to(path)
+                results.append(f"📄 {relative_path}:{data['line_number']}: {text.strip()}")
+                if len(results) >= max_results:
+                    break
+        finally:
+            if process.returncode is None:
                 try:
-                    # Check file size
-                    if file_path.stat().st_size > 1024 * 1024:  # Skip files > 1MB
-                        continue
-
-                    with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
-                        for line_num, line in enumerate(f, 1):
-                            if regex.search(line):
-                                relative_path = file_path.relative_to(path)
-                                results.append(
-                                    f"📄 {relative_path}:{line_num}: {line.strip()}"
-                                )
-
-                                if len(results) >= max_results:
-                                    return results
-                except (PermissionError, OSError):
-                    # Skip files we can't read
-                    continue
-
+                    process.kill()
+                except ProcessLookupError:
+                    pass
+            await process.wait()
+
+        # Exit code 2 means an error (e.g. a regex ripgrep doesn't support);
+        # without any matches, let the Python search handle it
+        if process.returncode == 2 and not results:
+            return None
         return results
 
 
@@ -229,6 +527,7 @@ class ListDirectoryTool(Tool):
             ],
             requires_approval=False,
             dangerous=False,
+            read_only=True,
             timeout=10,
         )
 
@@ -248,24 +547,21 @@ class ListDirectoryTool(Tool):
             results = []
 
             if recursive:
-                for root, dirs, files in os.walk(dir_path):
-                    # Filter hidden directories
-                    if not show_hidden:
-                        dirs[:] = [d for d in dirs if not d.startswith(".")]
-
-                    level = len(Path(root).relative_to(dir_path).parts)
+                # Filter hidden directories
+                skip_dir = (lambda name: False) if show_hidden else _is_hidden
+                for root, level, files in _walk(dir_path, skip_dir):
                     indent = "  " * level
 
-                    rel_root = Path(root).relative_to(dir_path)
-                    if rel_root != Path("."):
-                        results.append(f"{indent}📁 {rel_root.name}/")
+                    if level:
+                        results.append(f"{indent}📁 {os.path.basename(root)}/")
 
-                    for filename in sorted(files):
+                    for filename in sorted(entry.name for entry in files):
                         if not show_hidden and filename.startswith("."):
                             continue
                         results.append(f"{indent}  📄 {filename}")
             else:
-                items = sorted(dir_path.iterdir(), key=lambda x: (not x.is_dir(), x.name))
+                with os.scandir(dir_path) as entries:
+                    items = sorted(entries, key=lambda x: (not x.is_dir(), x.name))
 
                 for item in items:
                     if not show_hidden and item.name.startswith("."):
@@ -274,6 +570,7 @@ class ListDirectoryTool(Tool):
                     if item.is_dir():
                         results.append(f"📁 {item.name}/")
                     else:
+                        # DirEntry.stat() caches the result
                         size = item.stat().st_size
                         size_str = self._format_size(size)
                         results.append(f"📄 {item.name} ({size_str})")
@@ -42,6 +42,7 @@ class GitDiffTool(Tool):
             ],
             requires_approval=False,
             dangerous=False,
+            read_only=True,
             timeout=10,
         )
 
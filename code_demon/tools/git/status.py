@@ -28,6 +28,7 @@ class GitStatusTool(Tool):
             ],
             requires_approval=False,
             dangerous=False,
+            read_only=True,
             timeout=10,
         )
 
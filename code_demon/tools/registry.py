@@ -46,6 +46,7 @@ class ToolMetadata:
     parameters: List[ToolParameter]
     requires_approval: bool = False
     dangerous: bool = False
+    read_only: bool = False  # no side effects; may run alongside other read-only calls
     timeout: int = 30  # seconds
 
 
@@ -109,21 +110,49 @@ class ToolRegistry:
     """Central registry for all tools"""
 
     def __init__(self):
-        self._tools: Dict[str, Tool] = {}
+        # None marks a lazily registered tool that hasn't been constructed yet
+        self._tools: Dict[str, Optional[Tool]] = {}
+        self._factories: Dict[str, Callable[[], Tool]] = {}
         self._approval_handler: Optional[Callable[[str, str], bool]] = None
 
+        # Bumped whenever the set of tools changes, so callers can cache derived data
+        self.version = 0
+
     def register(self, tool: Tool) -> None:
         """Register a tool"""
         self._tools[tool.metadata.name] = tool
+        self._factories.pop(tool.metadata.name, None)
+        self.version += 1
+
+    def register_lazy(self, name: str, factory: Callable[[], Tool]) -> None:
+        """
+        Register a tool without constructing it
+
+        Args:
+            name: Tool name (must match the tool's metadata name)
+            factory: Callable that imports and builds the tool on first use
+        """
+        self._tools[name] = None
+        self._factories[name] = factory
+        self.version += 1
 
     def unregister(self, name: str) -> None:
         """Unregister a tool"""
-        if name in self._tools:
-            del self._tools[name]
+        self._tools.pop(name, None)
+        self._factories.pop(name, None)
+        self.version += 1
 
     def get_tool(self, name: str) -> Optional[Tool]:
         """Get a tool by name"""
-        return self._tools.get(name)
+        tool = self._tools.get(name)
+        if tool is None and name in self._factories:
+            tool = self._factories.pop(name)()
+            self._tools[name] = tool
+        return tool
+
+    def _all_tools(self) -> List[Tool]:
+        """Get all tools in registration order, constructing lazy ones"""
+        return [self.get_tool(name) for name in list(self._tools)]
 
     def list_tools(self) -> List[str]:
         """List all registered tool names"""
@@ -132,15 +161,15 @@ class ToolRegistry:
     def list_tools_by_category(self, category: ToolCategory) -> List[str]:
         """List tools in a specific category"""
         return [
-            name
-            for name, tool in self._tools.items()
+            tool.metadata.name
+            for tool in self._all_tools()
             if tool.metadata.category == category
         ]
 
     def get_tools_for_llm(self) -> List[Dict[str, Any]]:
         """Get all tools in LLM-compatible format"""
         tools = []
-        for tool in self._tools.values():
+        for tool in self._all_tools():
             tools.append(
                 {
                     "name": tool.metadata.name,
@@ -210,7 +239,7 @@ class ToolRegistry:
             if suggestions:
                 error_msg += f"\n\nDid you mean one of these?\n"
                 for suggestion in suggestions:
-                    tool_obj = self._tools.get(suggestion)
+                    tool_obj = self.get_tool(suggestion)
                     if tool_obj:
                         error_msg += f"  • {suggestion} - {tool_obj.metadata.description}\n"
                 error_msg += "\nIMPORTANT: Only use tools that actually exist. Do not invent tool names."
@@ -218,11 +247,11 @@ class ToolRegistry:
                 # No suggestions - list available tools in the relevant category
                 error_msg += f"\n\nNo similar tools found. Available tools:\n"
                 categories = {}
-                for tool_name, tool_obj in self._tools.items():
+                for tool_obj in self._all_tools():
                     cat = tool_obj.metadata.category.value
                     if cat not in categories:
                         categories[cat] = []
-                    categories[cat].append(tool_name)
+                    categories[cat].append(tool_obj.metadata.name)
 
                 for category, tools in sorted(categories.items()):
                     error_msg += f"\n{category}: {', '.join(tools)}"
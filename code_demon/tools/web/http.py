@@ -218,6 +218,7 @@ class WebSearchTool(Tool):
             ],
             requires_approval=False,
             dangerous=False,
+            read_only=True,
             timeout=30,
         )
 
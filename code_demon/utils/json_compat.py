@@ -0,0 +1,62 @@
+"""
+JSON Helpers
+
+Fast JSON encoding/decoding via orjson, falling back to the stdlib
+"""
+
+import json
+from dataclasses import fields, is_dataclass
+from datetime import date, datetime
+from typing import Any
+
+# Try to import orjson, but don't fail if not installed (graceful degradation)
+try:
+    import orjson
+
+    HAS_ORJSON = True
+except ImportError:
+    orjson = None
+    HAS_ORJSON = False
+
+JSONDecodeError = json.JSONDecodeError  # orjson.JSONDecodeError subclasses it
+
+
+def dumps(obj: Any, indent: bool = False) -> bytes:
+    """
+    Serialize an object to UTF-8 encoded JSON
+
+    Dataclasses and datetimes are serialized too (as objects and ISO 8601 strings).
+
+    Args:
+        obj: Object to serialize
+        indent: Pretty-print with two-space indentation
+
+    Returns:
+        JSON document as bytes
+    """
+    if HAS_ORJSON:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if indent else 0)
+
+    return json.dumps(
+        obj,
+        ensure_ascii=False,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        default=_default,
+    ).encode("utf-8")
+
+
+def _default(obj: Any) -> Any:
+    """Serialize dataclasses and datetimes for the stdlib encoder like orjson does"""
+    if is_dataclass(obj) and not isinstance(obj, type):
+        return {f.name: getattr(obj, f.name) for f in fields(obj)}
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def loads(data: bytes | str) -> Any:
+    """Deserialize a JSON document from bytes or str"""
+    if HAS_ORJSON:
+        return orjson.loads(data)
+    return json.loads(data)
@@ -0,0 +1,94 @@
+"""
+Execution tools: exit codes, timeouts and the fork server fallback
+"""
+
+import asyncio
+import time
+
+import pytest
+
+from code_demon.tools.execution import command
+from code_demon.tools.execution.command import ExecuteCommandTool, RunPythonTool
+from code_demon.tools.execution.forkserver import ForkServer
+
+# Ignores SIGTERM, so only the SIGKILL after the grace period stops it
+STUBBORN_SCRIPT = """
+import signal, time
+signal.signal(signal.SIGTERM, signal.SIG_IGN)
+print("started", flush=True)
+time.sleep(30)
+"""
+
+
+@pytest.fixture(autouse=True)
+def short_grace_period(monkeypatch):
+    monkeypatch.setattr(command, "_KILL_GRACE_PERIOD", 0.5)
+
+
+def run_python(code, timeout=30, server=None):
+    """Run code with run_python, through server (None: a fresh interpreter)"""
+
+    async def run():
+        try:
+            return await RunPythonTool().execute(code=code, timeout=timeout)
+        finally:
+            if server is not None:
+                await server.aclose()
+
+    return asyncio.run(run())
+
+
+@pytest.fixture(params=["fork_server", "subprocess"])
+def server(request, monkeypatch):
+    server = ForkServer() if request.param == "fork_server" else None
+    monkeypatch.setattr(command, "get_fork_server", lambda: server)
+    return server
+
+
+def test_run_python_exit_code(server):
+    output = run_python("import sys\nprint('out')\nsys.exit(3)", server=server)
+
+    assert "Exit code: 3" in output
+    assert "out" in output
+
+
+def test_run_python_exception(server):
+    output = run_python("raise ValueError('boom')", server=server)
+
+    assert "Exit code: 1" in output
+    assert "ValueError: boom" in output
+
+
+def test_run_python_kills_script_ignoring_sigterm(server):
+    started = time.monotonic()
+    output = run_python(STUBBORN_SCRIPT, timeout=1, server=server)
+
+    assert output == "Error: Code execution timed out after 1 seconds"
+    assert time.monotonic() - started < 1 + command._KILL_GRACE_PERIOD + 2
+
+
+@pytest.mark.parametrize("python", ["/nonexistent/python3", "false"])
+def test_run_python_falls_back_when_fork_server_fails(monkeypatch, python):
+    # Either the server can't be started at all or it exits right away
+    server = ForkServer(python)
+    monkeypatch.setattr(command, "get_fork_server", lambda: server)
+
+    output = run_python("print(6 * 7)", server=server)
+
+    assert "Exit code: 0" in output
+    assert "42" in output
+
+
+def test_execute_command_exit_code():
+    output = asyncio.run(ExecuteCommandTool().execute(command="echo oops >&2; exit 4"))
+
+    assert "Exit code: 4" in output
+    assert "oops" in output
+
+
+def test_execute_command_kills_command_ignoring_sigterm():
+    started = time.monotonic()
+    output = asyncio.run(ExecuteCommandTool().execute(command="trap '' TERM; sleep 30", timeout=1))
+
+    assert output == "Error: Command timed out after 1 seconds"
+    assert time.monotonic() - started < 1 + command._KILL_GRACE_PERIOD + 2
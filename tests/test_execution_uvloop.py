@@ -0,0 +1,47 @@
+"""
+Execution tools under uvloop (installed with the speedups extra)
+"""
+
+import pytest
+
+from code_demon.tools.execution import command
+from code_demon.tools.execution.command import ExecuteCommandTool, RunPythonTool, RunTestsTool
+
+uvloop = pytest.importorskip("uvloop")
+
+
+def test_execute_command():
+    output = uvloop.run(ExecuteCommandTool().execute(command="echo hello"))
+
+    assert "Exit code: 0" in output
+    assert "hello" in output
+
+
+def test_run_python_without_fork_server(monkeypatch):
+    monkeypatch.setattr(command, "get_fork_server", lambda: None)
+
+    output = uvloop.run(RunPythonTool().execute(code="print(6 * 7)"))
+
+    assert "Exit code: 0" in output
+    assert "42" in output
+
+
+def test_run_python_with_fork_server():
+    async def run():
+        try:
+            return await RunPythonTool().execute(code="print(6 * 7)")
+        finally:
+            await command.get_fork_server().aclose()
+
+    output = uvloop.run(run())
+
+    assert "Exit code: 0" in output
+    assert "42" in output
+
+
+def test_run_tests(tmp_path):
+    (tmp_path / "test_ok.py").write_text("def test_ok():\n    assert True\n")
+
+    output = uvloop.run(RunTestsTool().execute(path=str(tmp_path), test_type="unittest"))
+
+    assert "Exit code: 0" in output
@@ -0,0 +1,186 @@
+"""
+History storage: session files, journals and crash recovery
+"""
+
+import json
+from datetime import datetime, timedelta
+
+from code_demon.history.storage import JOURNAL_SUFFIX, HistoryStorage
+from code_demon.history.types import (
+    ChatSession,
+    MessageRecord,
+    MessageRole,
+    SessionMetadata,
+    ToolCallRecord,
+)
+
+T0 = datetime(2024, 5, 1, 12, 0, 0)
+
+
+def tool_call(name, at):
+    return ToolCallRecord(
+        tool=name,
+        arguments={"path": "a.py"},
+        result="ok",
+        success=True,
+        timestamp=at,
+        duration_ms=3,
+    )
+
+
+def session_file(history_dir):
+    (path,) = history_dir.glob("*_*.json")
+    return path
+
+
+def test_tool_calls_are_stored_once_and_referenced(tmp_path):
+    read = tool_call("read_file", T0 + timedelta(seconds=1))
+    write = tool_call("write_file", T0 + timedelta(seconds=2))
+    # Attached to a message but never added to tools_called
+    stray = tool_call("search_files", T0 + timedelta(seconds=3))
+    session = ChatSession(
+        session_id="0123456789abcdef",
+        start_time=T0,
+        end_time=T0 + timedelta(minutes=2),
+        messages=[
+            MessageRecord(MessageRole.USER, "fix a.py", T0),
+            MessageRecord(MessageRole.ASSISTANT, "fixed", T0 + timedelta(seconds=4), [write, read]),
+            MessageRecord(MessageRole.ASSISTANT, "found", T0 + timedelta(seconds=5), [stray]),
+        ],
+        tools_called=[read, write],
+        metadata=SessionMetadata(problem="bug", tags=["py"], success=True),
+        achievements_earned=["first_fix"],
+    )
+    storage = HistoryStorage(tmp_path)
+    storage._save_session(session)
+
+    data = json.loads(session_file(tmp_path).read_text())
+    messages = data["messages"]
+    assert [m["tool_call_refs"] for m in messages] == [[], [1, 0], []]
+    assert "tool_calls" not in messages[1]
+    assert [tc["tool"] for tc in messages[2]["tool_calls"]] == ["search_files"]
+
+    loaded = HistoryStorage(tmp_path).load_session(session.session_id)
+    assert loaded == session
+    # Referenced calls are shared with tools_called again, as when recorded
+    assert loaded.messages[1].tool_calls[0] is loaded.tools_called[1]
+
+
+def test_loads_sessions_with_inline_tool_calls(tmp_path):
+    call = {
+        "tool": "read_file",
+        "arguments": {"path": "a.py"},
+        "result": "ok",
+        "success": True,
+        "timestamp": "2024-05-01T12:00:01",
+        "duration_ms": 3,
+    }
+    # Written before tool_call_refs: each message carries its own copy of the call
+    data = {
+        "session_id": "0123456789abcdef",
+        "start_time": "2024-05-01T12:00:00",
+        "end_time": "2024-05-01T12:02:00",
+        "messages": [
+            {"role": "user", "content": "read a.py", "timestamp": "2024-05-01T12:00:00"},
+            {
+                "role": "assistant",
+                "content": "done",
+                "timestamp": "2024-05-01T12:00:02",
+                "tool_calls": [call],
+            },
+        ],
+        "tools_called": [call],
+        "metadata": {"problem": "bug", "solution": None, "tags": [], "success": True},
+        "achievements_earned": [],
+    }
+    (tmp_path / "20240501_120000_01234567.json").write_text(json.dumps(data))
+
+    session = HistoryStorage(tmp_path).load_session("0123456789abcdef")
+    expected = tool_call("read_file", T0 + timedelta(seconds=1))
+    assert session.messages[0].tool_calls == []
+    assert session.messages[1].tool_calls == [expected]
+    assert session.tools_called == [expected]
+    assert session.end_time == T0 + timedelta(minutes=2)
+    assert session.metadata.success is True
+
+
+def crashed_session(history_dir):
+    """Run a session and stop without end_session, leaving its journal behind"""
+    storage = HistoryStorage(history_dir)
+    session = storage.start_session()
+    storage.add_batch(
+        [
+            MessageRecord(MessageRole.USER, "read a.py", T0 + timedelta(seconds=1)),
+            tool_call("read_file", T0 + timedelta(seconds=5)),
+            MessageRecord(MessageRole.ASSISTANT, "done", T0 + timedelta(seconds=3)),
+        ]
+    )
+    storage.close()
+    return session.session_id
+
+
+def journals(history_dir):
+    return list(history_dir.glob(f"*{JOURNAL_SUFFIX}"))
+
+
+def test_recovers_crashed_session(tmp_path):
+    session_id = crashed_session(tmp_path)
+    assert len(journals(tmp_path)) == 1
+
+    storage = HistoryStorage(tmp_path)
+    assert journals(tmp_path) == []
+
+    session = storage.load_session(session_id)
+    assert [m.content for m in session.messages] == ["read a.py", "done"]
+    assert [tc.tool for tc in session.tools_called] == ["read_file"]
+    # Ends with the latest record, whichever list it is in
+    assert session.end_time == T0 + timedelta(seconds=5)
+    assert session.metadata.success is True
+    assert storage.get_stats().total_sessions == 1
+
+
+def test_recovered_session_without_records_ends_at_start(tmp_path):
+    storage = HistoryStorage(tmp_path)
+    session = storage.start_session()
+    storage.close()
+
+    recovered = HistoryStorage(tmp_path).load_session(session.session_id)
+    assert recovered.end_time == recovered.start_time
+    assert recovered.messages == []
+
+
+def test_skips_truncated_last_line(tmp_path):
+    session_id = crashed_session(tmp_path)
+    (journal,) = journals(tmp_path)
+    with open(journal, "ab") as f:
+        f.write(b'{"type": "message", "record": {"role": "us')
+
+    session = HistoryStorage(tmp_path).load_session(session_id)
+    assert [m.content for m in session.messages] == ["read a.py", "done"]
+    assert journals(tmp_path) == []
+
+
+def test_journal_without_start_record_is_dropped(tmp_path):
+    (tmp_path / f"orphan{JOURNAL_SUFFIX}").write_bytes(b'{"type": "achievement", "id": "x"}\n')
+
+    storage = HistoryStorage(tmp_path)
+    assert journals(tmp_path) == []
+    assert storage.list_sessions() == []
+
+
+def test_skips_journal_of_running_session(tmp_path):
+    running = HistoryStorage(tmp_path)
+    session = running.start_session()
+    running.add_message(MessageRole.USER, "still going")
+
+    # The running session holds the journal lock, so a second process leaves it alone
+    other = HistoryStorage(tmp_path)
+    assert len(journals(tmp_path)) == 1
+    assert other.load_session(session.session_id) is None
+
+    running.end_session()
+    assert journals(tmp_path) == []
+    loaded = other.load_session(session.session_id)
+    assert [m.content for m in loaded.messages] == ["still going"]
+    running.close()
+    other.close()
@@ -0,0 +1,151 @@
+"""
+Content search (search_files with search_type="content")
+"""
+
+import asyncio
+import json
+import re
+import shutil
+import sys
+
+import pytest
+
+from code_demon.tools.files import search as search_module
+from code_demon.tools.files.search import SearchFilesTool
+
+
+@pytest.fixture
+def tree(tmp_path):
+    (tmp_path / "a.py").write_text("x = 1\n    return value\n")
+    (tmp_path / "b.txt").write_text("alpha\nbeta\n\ngamma beta\n")
+    return tmp_path
+
+
+def search(path, pattern, case_sensitive=True, max_results=50):
+    return SearchFilesTool()._search_content(path, pattern, case_sensitive, max_results)
+
+
+def per_line(path, name, pattern, flags=0):
+    """What searching each line on its own finds"""
+    regex = re.compile(pattern, flags)
+    lines = (path / name).read_text().splitlines(keepends=True)
+    return [
+        f"📄 {name}:{i}: {line.strip()}" for i, line in enumerate(lines, 1) if regex.search(line)
+    ]
+
+
+def test_match_spanning_lines_reports_the_matching_line(tree):
+    assert search(tree, r"\s+return") == ["📄 a.py:2: return value"]
+
+
+def test_no_match_across_lines(tree):
+    assert search(tree, r"1\s+return") == []
+    assert search(tree, r"alpha[^x]beta") == []
+
+
+@pytest.mark.parametrize(
+    "pattern",
+    [r"[^x]+", r"\s", r"a\s*$", r"^$", r"(?<=\n)beta", r"a(?=\n)", r"\Agamma", r"beta\Z", ""],
+)
+def test_agrees_with_searching_each_line(tree, pattern):
+    expected = per_line(tree, "a.py", pattern) + per_line(tree, "b.txt", pattern)
+    assert search(tree, pattern) == expected
+
+
+def test_literal_one_result_per_line(tree):
+    assert search(tree, "beta", max_results=50) == [
+        "📄 b.txt:2: beta",
+        "📄 b.txt:4: gamma beta",
+    ]
+
+
+def test_case_insensitive(tree):
+    assert search(tree, "GAMMA", case_sensitive=False) == ["📄 b.txt:4: gamma beta"]
+
+
+def test_max_results(tree):
+    assert len(search(tree, ".", max_results=2)) == 2
+
+
+# ripgrep backend
+
+FAKE_RG = """\
+#!{python}
+import os, sys
+with open(os.environ["FAKE_RG_ARGS"], "w") as f:
+    f.write("\\n".join(sys.argv[1:]))
+sys.stdout.write(open(os.environ["FAKE_RG_OUTPUT"]).read())
+sys.exit(int(os.environ.get("FAKE_RG_EXIT", "0")))
+"""
+
+
+def rg_match(path, line_number, text):
+    return json.dumps(
+        {
+            "type": "match",
+            "data": {
+                "path": {"text": str(path)},
+                "lines": {"text": text},
+                "line_number": line_number,
+            },
+        }
+    )
+
+
+@pytest.fixture
+def fake_rg(tmp_path, monkeypatch):
+    """Point the search at a stand-in rg that replays canned --json output"""
+    script = tmp_path / "rg"
+    script.write_text(FAKE_RG.format(python=sys.executable))
+    script.chmod(0o755)
+    monkeypatch.setattr(search_module, "_RG_PATH", str(script))
+    monkeypatch.setenv("FAKE_RG_ARGS", str(tmp_path / "args"))
+    monkeypatch.setenv("FAKE_RG_OUTPUT", str(tmp_path / "output"))
+
+    def run(tree, records, exit_code=0, max_results=50):
+        (tmp_path / "output").write_text("".join(r + "\n" for r in records))
+        monkeypatch.setenv("FAKE_RG_EXIT", str(exit_code))
+        results = asyncio.run(SearchFilesTool()._search_content_rg(tree, "beta", True, max_results))
+        return results, (tmp_path / "args").read_text().splitlines()
+
+    return run
+
+
+def test_rg_results(tree, fake_rg):
+    records = [
+        json.dumps({"type": "begin", "data": {}}),
+        rg_match(tree / "b.txt", 2, "beta\n"),
+        json.dumps({"type": "match", "data": {"path": {"bytes": "/w=="}, "lines": {}}}),
+        rg_match(tree / "b.txt", 4, "gamma beta\n"),
+    ]
+    results, args = fake_rg(tree, records)
+
+    assert results == ["📄 b.txt:2: beta", "📄 b.txt:4: gamma beta"]
+    assert args[args.index("--sort") + 1] == "path"
+
+
+def test_rg_max_results(tree, fake_rg):
+    records = [rg_match(tree / "b.txt", n, "beta\n") for n in range(1, 6)]
+    results, _ = fake_rg(tree, records, max_results=2)
+
+    assert results == ["📄 b.txt:1: beta", "📄 b.txt:2: beta"]
+
+
+def test_rg_error_falls_back(tree, fake_rg):
+    results, _ = fake_rg(tree, [], exit_code=2)
+
+    assert results is None
+
+
+@pytest.mark.skipif(shutil.which("rg") is None, reason="ripgrep is not installed")
+@pytest.mark.parametrize("pattern", [r"\s+return", r"1\s+return", "beta", r"[^x]+", r"a$"])
+@pytest.mark.parametrize("max_results", [1, 50])
+def test_rg_agrees_with_python_search(tree, monkeypatch, pattern, max_results):
+    (tree / "sub").mkdir()
+    (tree / "sub" / "c.txt").write_text("beta\nreturn\n")
+    monkeypatch.setattr(search_module, "_RG_PATH", shutil.which("rg"))
+    tool = SearchFilesTool()
+
+    rg_results = asyncio.run(tool._search_content_rg(tree, pattern, True, max_results))
+
+    assert rg_results == search(tree, pattern, max_results=max_results)
@@ -0,0 +1,93 @@
+"""
+Settings: .env parsing and value coercion
+"""
+
+from typing import Literal
+
+import pytest
+
+from code_demon.config.settings import _coerce, _read_env_file
+
+
+def read(tmp_path, text):
+    env_file = tmp_path / ".env"
+    env_file.write_text(text)
+    return _read_env_file(str(env_file))
+
+
+def test_missing_file(tmp_path):
+    assert _read_env_file(str(tmp_path / ".env")) == {}
+
+
+def test_keys_comments_and_export(tmp_path):
+    values = read(tmp_path, "# comment\n\nexport OLLAMA_URL=http://host:1\nnot a setting\n")
+    assert values == {"ollama_url": "http://host:1"}
+
+
+@pytest.mark.parametrize(
+    "line, expected",
+    [
+        ("MAX_TOOL_DEPTH=5  # depth", "5"),
+        ("OLLAMA_MODEL=qwen # model", "qwen"),
+        ("OLLAMA_MODEL=qwen\t# model", "qwen"),
+        ("OLLAMA_MODEL=a#b", "a#b"),
+        ("OLLAMA_MODEL= spaced value ", "spaced value"),
+        ("OLLAMA_MODEL=", ""),
+    ],
+)
+def test_unquoted_values(tmp_path, line, expected):
+    assert read(tmp_path, line + "\n") == {line.split("=")[0].lower(): expected}
+
+
+@pytest.mark.parametrize(
+    "value, expected",
+    [
+        ('"x # y"', "x # y"),
+        ('"a" # comment', "a"),
+        ("'a' # comment", "a"),
+        (r'"say \"hi\""', 'say "hi"'),
+        (r'"tab\there\n"', "tab\there\n"),
+        (r"'it\'s'", "it's"),
+        (r"'back\\slash'", "back\\slash"),
+        (r"'no \n escape'", r"no \n escape"),
+    ],
+)
+def test_quoted_values(tmp_path, value, expected):
+    assert read(tmp_path, f"KEY={value}\n") == {"key": expected}
+
+
+@pytest.mark.parametrize(
+    "raw, expected", [("1", True), ("Yes", True), (" on ", True), ("0", False), ("off", False)]
+)
+def test_coerce_bool(raw, expected):
+    assert _coerce("history_enabled", bool, raw) is expected
+
+
+def test_coerce_bool_invalid():
+    with pytest.raises(ValueError, match=r"Invalid boolean for HISTORY_ENABLED: 'maybe'"):
+        _coerce("history_enabled", bool, "maybe")
+
+
+def test_coerce_int():
+    assert _coerce("max_tool_depth", int, " 5 ") == 5
+
+
+def test_coerce_int_invalid():
+    with pytest.raises(ValueError, match=r"Invalid integer for MAX_TOOL_DEPTH: '5 # depth'"):
+        _coerce("max_tool_depth", int, "5 # depth")
+
+
+def test_coerce_literal():
+    assert _coerce("llm_provider", Literal["ollama", "textgen"], "textgen") == "textgen"
+
+
+def test_coerce_literal_invalid():
+    with pytest.raises(
+        ValueError,
+        match=r"Invalid value for LLM_PROVIDER: 'openai' \(expected one of ollama, textgen\)",
+    ):
+        _coerce("llm_provider", Literal["ollama", "textgen"], "openai")
+
+
+def test_coerce_str_is_kept_as_is():
+    assert _coerce("ollama_model", str, " qwen ") == " qwen "